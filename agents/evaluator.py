@@ -5,7 +5,7 @@ Uses Pydantic structured output to return validated scores and feedback.
 The evaluator:
 1. Reads the draft and the original task.
 2. Scores it on 5 dimensions (0-10).
-3. Calculates an average score.
+3. Derives the overall score as their average (see ``EvaluationOutput``).
 4. Generates a critique if the score is below threshold.
 """
 
@@ -16,7 +16,7 @@ from langchain_core.prompts import ChatPromptTemplate
 
 from agents.models import EvaluationOutput
 from graph.state import AgentState
-from utils.llm import get_llm
+from utils.llm import MODEL_CONFIG, get_llm, get_structured_llm
 
 # ── Constants ────────────────────────────────────────────────────────
 SCORE_DIMENSIONS = (
@@ -55,39 +55,36 @@ real data, names, and numbers? (9-10: deeply personalised; 5-6: some \
 customisation; 0-3: generic boilerplate)
 
 ## Rules
-- Calculate overall_score as the arithmetic mean of all 5 dimension scores.
-- If overall_score >= 9.0, set critique to an empty string.
-- If overall_score < 9.0, provide exactly 3 specific, actionable \
+- The overall score is the arithmetic mean of the 5 dimension scores.
+- If the overall score is >= 9.0, set critique to an empty string.
+- If the overall score is < 9.0, provide exactly 3 specific, actionable \
 improvements the writer should make in the next revision.
 - Be strict but constructive — every point of critique should explain \
 both *what* is wrong and *how* to fix it."""
 
 
+_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", EVALUATOR_SYSTEM_PROMPT),
+        ("human", "Task: {task}\n\nDraft:\n{draft}"),
+    ]
+)
+
+
 # ── Graph node ───────────────────────────────────────────────────────
-def evaluator_node(state: AgentState) -> dict:
+async def evaluator_node(state: AgentState) -> dict:
     """LangGraph node – scores the draft and returns structured feedback."""
-    llm = get_llm(model="openai/gpt-oss-120b", temperature=0.1)
-    structured_llm = llm.with_structured_output(EvaluationOutput)
-
-    draft = state.get("draft", "")
     task = state.get("task", "")
+    draft = state.get("draft", "")
 
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", EVALUATOR_SYSTEM_PROMPT),
-            ("human", f"Task: {task}\n\nDraft:\n{draft}"),
-        ]
-    )
-
-    result: EvaluationOutput = structured_llm.invoke(prompt.format_messages())
-
-    dimension_scores = {
-        "Clarity": result.clarity,
-        "Persuasiveness": result.persuasiveness,
-        "Completeness": result.completeness,
-        "Structure": result.structure,
-        "Specificity": result.specificity,
-    }
+    # Scoring is deterministic, so the response cache spares an unchanged
+    # draft a second LLM round trip
+    llm = get_llm(model=MODEL_CONFIG["evaluator"], temperature=0.0, cache=True)
+    structured_llm = get_structured_llm(llm, EvaluationOutput)
+    messages = _prompt.format_messages(task=task, draft=draft)
+    result = await structured_llm.ainvoke(messages)
+
+    dimension_scores = {dim: getattr(result, dim.lower()) for dim in SCORE_DIMENSIONS}
 
     current_revisions = state.get("revision_count", 0)
 
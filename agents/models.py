@@ -6,7 +6,7 @@ replace fragile regex-based parsing with validated, typed responses.
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 
 
 # ── Planner ──────────────────────────────────────────────────────────
@@ -54,24 +54,40 @@ class SearchQueries(BaseModel):
 class EvaluationOutput(BaseModel):
     """Structured evaluation scores and critique from the Evaluator."""
 
-    clarity: float = Field(description="Score 0-10: clear language, easy to read.")
+    clarity: float = Field(
+        ge=0, le=10, description="Score 0-10: clear language, easy to read."
+    )
     persuasiveness: float = Field(
-        description="Score 0-10: compelling arguments, benefits-focused."
+        ge=0, le=10, description="Score 0-10: compelling arguments, benefits-focused."
     )
     completeness: float = Field(
-        description="Score 0-10: addresses all task requirements."
+        ge=0, le=10, description="Score 0-10: addresses all task requirements."
     )
-    structure: float = Field(description="Score 0-10: logical flow, proper formatting.")
-    specificity: float = Field(
-        description="Score 0-10: customised to client/industry, not generic."
+    structure: float = Field(
+        ge=0, le=10, description="Score 0-10: logical flow, proper formatting."
     )
-    overall_score: float = Field(
-        description="Average of the 5 dimension scores (0-10)."
+    specificity: float = Field(
+        ge=0,
+        le=10,
+        description="Score 0-10: customised to client/industry, not generic.",
     )
     critique: str = Field(
         default="",
         description=(
-            "If overall_score < 9.0, provide exactly 3 specific improvements. "
-            "If overall_score >= 9.0, leave empty."
+            "If the average score is below 9.0, provide exactly 3 specific "
+            "improvements. Otherwise leave empty."
         ),
     )
+
+    @computed_field
+    @property
+    def overall_score(self) -> float:
+        """Mean of the 5 dimension scores, computed locally (not by the LLM)."""
+        total = (
+            self.clarity
+            + self.persuasiveness
+            + self.completeness
+            + self.structure
+            + self.specificity
+        )
+        return round(total / 5, 2)
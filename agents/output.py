@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
-import time
+from datetime import UTC, datetime
 
 from langchain_core.messages import AIMessage
 
@@ -12,22 +13,26 @@ from graph.state import AgentState
 OUTPUT_DIR = "outputs"
 
 
-def output_node(state: AgentState) -> dict:
+def _write_text(path: str, text: str) -> None:
+    """Write *text* to *path* as UTF-8 (runs in a worker thread)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+async def output_node(state: AgentState) -> dict:
     """LangGraph node – saves the final draft to disk."""
     draft = state.get("draft", "")
     proposal_type = state.get("proposal_type", "General")
 
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    timestamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
     base_filename = f"{timestamp}_{proposal_type}_Proposal"
 
     md_path = os.path.join(OUTPUT_DIR, f"{base_filename}.md")
 
-    # 1. Save Markdown
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(draft)
+    # 1. Save Markdown (off the event loop)
+    await asyncio.to_thread(_write_text, md_path, draft)
 
     # PDF generation skipped due to missing system dependencies (cairo/gtk)
     # on Windows environment without manual installation.
@@ -36,5 +41,5 @@ def output_node(state: AgentState) -> dict:
 
     return {
         "messages": [AIMessage(content=msg)],
-        # We don't update state further as this is the end
+        "output_path": md_path,
     }
@@ -16,7 +16,7 @@ from langchain_core.prompts import ChatPromptTemplate
 
 from agents.models import PlannerOutput
 from graph.state import AgentState
-from utils.llm import get_llm
+from utils.llm import MODEL_CONFIG, get_llm, get_structured_llm
 
 PLANNER_SYSTEM_PROMPT = """\
 You are a Lead Proposal Strategist with 20+ years of experience crafting \
@@ -63,13 +63,13 @@ _prompt = ChatPromptTemplate.from_messages(
 )
 
 
-def planner_node(state: AgentState) -> dict:
+async def planner_node(state: AgentState) -> dict:
     """LangGraph node – runs the planner and returns structured state."""
-    llm = get_llm(model="openai/gpt-oss-120b", temperature=0.3)
-    structured_llm = llm.with_structured_output(PlannerOutput)
+    llm = get_llm(model=MODEL_CONFIG["planner"], temperature=0.3, cache=True)
+    structured_llm = get_structured_llm(llm, PlannerOutput)
 
     messages = _prompt.format_messages(task=state["task"])
-    result: PlannerOutput = structured_llm.invoke(messages)
+    result: PlannerOutput = await structured_llm.ainvoke(messages)
 
     # Build a human-readable plan string for downstream agents
     plan_text = _format_plan(result)
@@ -77,6 +77,7 @@ def planner_node(state: AgentState) -> dict:
     return {
         "messages": [AIMessage(content=plan_text)],
         "plan": plan_text,
+        "research_needed": result.research_needed,
         "proposal_type": result.proposal_type,
         "questions_for_user": result.questions_for_user,
     }
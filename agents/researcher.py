@@ -2,37 +2,70 @@
 
 The researcher:
 1. Reads the plan from the Planner (specifically the "Research Needed" items).
-2. Uses Pydantic structured output to extract targeted search queries.
-3. Calls Tavily for each query.
+2. Searches those items directly, or — when there are none or the user
+   gave feedback — uses Pydantic structured output to extract queries.
+3. Calls Tavily for all queries concurrently, reusing recent results.
 4. Synthesises the results into a structured research brief.
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
+import re
+import time
+from functools import lru_cache
 from dotenv import load_dotenv
 
 from langchain_core.messages import AIMessage
 from langchain_core.prompts import ChatPromptTemplate
-from tavily import TavilyClient
-from concurrent.futures import ThreadPoolExecutor
+from tavily import AsyncTavilyClient
 
 from agents.models import SearchQueries
 from graph.state import AgentState
-from utils.llm import get_llm
+from utils.llm import MODEL_CONFIG, get_llm, get_structured_llm
 
 load_dotenv()
 
 # ── Tavily client ───────────────────────────────────────────────────
 _tavily_api_key = os.getenv("TAVILY_API_KEY", "")
 
+# Upper bound on in-flight Tavily requests per researcher run
+MAX_CONCURRENT_SEARCHES = 5
 
-def _get_tavily_client() -> TavilyClient:
-    """Return a Tavily client (lazy so tests can mock the key)."""
+# Token-set Jaccard similarity above which two queries count as duplicates
+QUERY_SIMILARITY_THRESHOLD = 0.75
+
+_WORD_RE = re.compile(r"\w+")
+
+# Per-result cap on page content passed on to the synthesis prompt
+MAX_RESULT_CHARS = 2000
+
+# Sentences kept per result, and overall budget for the synthesis input
+MAX_SENTENCES_PER_RESULT = 3
+MAX_RAW_RESULTS_CHARS = 12_000
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Recent query → formatted results, so repeated plans skip Tavily; entries
+# expire since web results go stale, and re-research on feedback refreshes them
+SEARCH_MEMO_SIZE = 128
+SEARCH_MEMO_TTL = 3600  # seconds
+_search_memo: dict[str, tuple[float, list[str]]] = {}
+
+
+def _get_tavily_client() -> AsyncTavilyClient:
+    """Return an async Tavily client (lazy so tests can mock the key)."""
     key = os.getenv("TAVILY_API_KEY", _tavily_api_key)
     if not key:
         raise ValueError("TAVILY_API_KEY is not set in the environment.")
-    return TavilyClient(api_key=key)
+    return _tavily_client_for(key)
+
+
+@lru_cache(maxsize=1)
+def _tavily_client_for(key: str) -> AsyncTavilyClient:
+    """Build one client per API key so its HTTP connection pool is reused."""
+    return AsyncTavilyClient(api_key=key)
 
 
 # ── Prompts ─────────────────────────────────────────────────────────
@@ -82,35 +115,100 @@ _synthesis_prompt = ChatPromptTemplate.from_messages(
 
 
 # ── Helpers ──────────────────────────────────────────────────────────
-def _search_query(client: TavilyClient, q: str) -> list[str]:
-    """Execute a single search query."""
-    try:
-        res = client.search(query=q, max_results=3).get("results", [])
-        return [
-            f"**{r.get('title')}**\n{r.get('content')}\nSource: {r.get('url')}"
-            for r in res
-        ]
-    except Exception as exc:
-        return [f"[Search failed for '{q}': {exc}]"]
-
-
-def _search_tavily(queries: list[str]) -> str:
-    """Run queries through Tavily concurrently and return concatenated results."""
+def _dedupe_queries(queries: list[str]) -> list[str]:
+    """Drop queries whose word set largely overlaps an earlier kept query."""
+    kept: list[str] = []
+    kept_tokens: list[set[str]] = []
+    for q in queries:
+        tokens = set(_WORD_RE.findall(q.lower()))
+        if not tokens:
+            continue
+        if any(
+            len(tokens & other) / len(tokens | other) >= QUERY_SIMILARITY_THRESHOLD
+            for other in kept_tokens
+        ):
+            continue
+        kept.append(q.strip())
+        kept_tokens.append(tokens)
+    return kept
+
+
+def _compact(query: str, content: str) -> str:
+    """Keep the sentences of *content* that best match *query*, in order."""
+    sentences = [s for s in _SENTENCE_RE.split(content.strip()) if s]
+    if len(sentences) <= MAX_SENTENCES_PER_RESULT:
+        return content
+
+    terms = set(_WORD_RE.findall(query.lower()))
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: -len(terms & set(_WORD_RE.findall(sentences[i].lower()))),
+    )
+    keep = sorted(ranked[:MAX_SENTENCES_PER_RESULT])
+    return " ".join(sentences[i] for i in keep)
+
+
+async def _search_query(
+    client: AsyncTavilyClient,
+    q: str,
+    semaphore: asyncio.Semaphore,
+    fresh: bool = False,
+) -> list[str]:
+    """Execute a single search query (memoised; failures are not cached).
+
+    With *fresh* set the memo is not read, only refreshed.
+    """
+    key = " ".join(q.lower().split())
+    cached = None if fresh else _search_memo.get(key)
+    if cached is not None and time.monotonic() - cached[0] < SEARCH_MEMO_TTL:
+        return cached[1]
+
+    async with semaphore:
+        try:
+            res = (await client.search(query=q, max_results=3)).get("results", [])
+        except Exception as exc:
+            return [f"[Search failed for '{q}': {exc}]"]
+    results = [
+        f"**{r.get('title')}**\n"
+        f"{_compact(q, r.get('content') or '')[:MAX_RESULT_CHARS]}\n"
+        f"Source: {r.get('url')}"
+        for r in res
+    ]
+
+    _search_memo.pop(key, None)
+    if len(_search_memo) >= SEARCH_MEMO_SIZE:
+        _search_memo.pop(next(iter(_search_memo)))
+    _search_memo[key] = (time.monotonic(), results)
+    return results
+
+
+async def _search_tavily(queries: list[str], fresh: bool = False) -> str:
+    """Run queries through Tavily concurrently and return concatenated results.
+
+    Pass *fresh* to bypass memoised results, e.g. when re-researching.
+    """
+    # Drop blanks and repeats so each distinct query costs one request
+    queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+    if not queries:
+        return "No results found."
+
     client = _get_tavily_client()
-    results: list[str] = []
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = [executor.submit(_search_query, client, q) for q in queries]
-        for future in futures:
-            results.extend(future.result())
+    batches = await asyncio.gather(
+        *(_search_query(client, q, semaphore, fresh) for q in queries)
+    )
+    raw = "\n---\n".join(r for batch in batches for r in batch)
+    if len(raw) > MAX_RAW_RESULTS_CHARS:
+        raw = raw[:MAX_RAW_RESULTS_CHARS] + "\n[Results truncated]"
 
-    return "\n---\n".join(results) if results else "No results found."
+    return raw or "No results found."
 
 
 # ── Graph node ───────────────────────────────────────────────────────
-def researcher_node(state: AgentState) -> dict:
+async def researcher_node(state: AgentState) -> dict:
     """LangGraph node – researches the plan and returns a research brief."""
-    llm = get_llm(model="openai/gpt-oss-120b", temperature=1)
+    llm = get_llm(model=MODEL_CONFIG["researcher"], temperature=1)
     plan = state.get("plan", "")
 
     if not plan:
@@ -120,21 +218,27 @@ def researcher_node(state: AgentState) -> dict:
             "search_queries": [],
         }
 
-    # Step 1: Extract queries using structured output
-    structured_llm = llm.with_structured_output(SearchQueries)
+    # Step 1: Use the planner's research topics as-is when nothing needs
+    # interpreting; otherwise extract queries using structured output
     user_feedback = state.get("user_feedback", "")
-    query_messages = _query_prompt.format_messages(
-        plan=plan, user_feedback=user_feedback
-    )
-    query_result: SearchQueries = structured_llm.invoke(query_messages)
-    queries = query_result.queries[:5]
-
-    # Step 2: Search
-    raw_results = _search_tavily(queries)
+    topics = state.get("research_needed") or []
+    if topics and not user_feedback:
+        queries = _dedupe_queries(topics)[:5]
+    else:
+        query_llm = get_llm(model=MODEL_CONFIG["research_queries"], temperature=1)
+        structured_llm = get_structured_llm(query_llm, SearchQueries)
+        query_messages = _query_prompt.format_messages(
+            plan=plan, user_feedback=user_feedback
+        )
+        query_result: SearchQueries = await structured_llm.ainvoke(query_messages)
+        queries = _dedupe_queries(query_result.queries)[:5]
+
+    # Step 2: Search (user feedback asks for new research, so skip the memo)
+    raw_results = await _search_tavily(queries, fresh=bool(user_feedback))
 
     # Step 3: Synthesise (free-form text is fine here)
     synthesis_messages = _synthesis_prompt.format_messages(raw_results=raw_results)
-    synthesis = llm.invoke(synthesis_messages)
+    synthesis = await llm.ainvoke(synthesis_messages)
     brief = synthesis.content if hasattr(synthesis, "content") else str(synthesis)
 
     return {
@@ -2,18 +2,32 @@
 
 from __future__ import annotations
 
-from langchain_core.messages import AIMessage
+import hashlib
+
+from langchain_core.messages import AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 
 from graph.state import AgentState
-from utils.llm import get_llm
-from utils.templates import PROPOSAL_TEMPLATES
+from utils.llm import MODEL_CONFIG, get_llm
+from utils.templates import SYSTEM_PROMPTS, USER_TEMPLATE
+
+# Templates are static, so parse each one once at import.  The system prompt
+# is passed as a message (not a template) so it is never re-formatted.
+_prompts = {
+    name: ChatPromptTemplate.from_messages(
+        [SystemMessage(content=system), ("human", USER_TEMPLATE)]
+    )
+    for name, system in SYSTEM_PROMPTS.items()
+}
 
+# Recent prompt → draft, so identical inputs don't pay for a fresh draft;
+# insertion order doubles as LRU order
+DRAFT_MEMO_SIZE = 32
+_draft_memo: dict[str, str] = {}
 
-def writer_node(state: AgentState) -> dict:
-    """LangGraph node – generates the proposal draft."""
-    llm = get_llm(model="openai/gpt-oss-120b", temperature=0.4)
 
+async def writer_node(state: AgentState) -> dict:
+    """LangGraph node – generates the proposal draft, streaming tokens."""
     plan = state.get("plan", "")
     research_data = state.get("research_data", "")
     proposal_type = state.get("proposal_type", "General")
@@ -22,29 +36,40 @@ def writer_node(state: AgentState) -> dict:
     revision_count = state.get("revision_count", 0)
 
     # Select template (fallback to General if type not found)
-    template_str = PROPOSAL_TEMPLATES.get(proposal_type, PROPOSAL_TEMPLATES["General"])
+    prompt = _prompts.get(proposal_type, _prompts["General"])
 
-    # If there is user feedback, prepend it to the research context
-    if user_feedback:
-        research_data = (
-            f"### Additional User Requirements\n{user_feedback}\n\n{research_data}"
-        )
-
-    # If revising, include the evaluator's critique
+    # Prepend the evaluator's critique (when revising) and any user feedback
+    # to the research context, joined in a single pass
+    context: list[str] = []
     if revision_count > 0 and critique:
-        research_data = (
+        context.append(
             f"### Evaluator Feedback (Revision {revision_count})\n"
-            f"Address these issues in this revision:\n{critique}\n\n"
-            f"{research_data}"
+            f"Address these issues in this revision:\n{critique}"
         )
+    if user_feedback:
+        context.append(f"### Additional User Requirements\n{user_feedback}")
+    context.append(research_data)
+
+    messages = prompt.format_messages(plan=plan, research_data="\n\n".join(context))
+    key = hashlib.blake2b(
+        "\0".join(m.content for m in messages).encode(), digest_size=16
+    ).hexdigest()
 
-    # We can use a simple template here since the instructions are embedded
-    prompt = ChatPromptTemplate.from_template(template_str)
+    # Feedback asks for a change, so never answer it with a remembered draft
+    content = None if user_feedback else _draft_memo.pop(key, None)
+    if content is None:
+        llm = get_llm(model=MODEL_CONFIG["writer"], temperature=0.4)
 
-    messages = prompt.format_messages(plan=plan, research_data=research_data)
-    response = llm.invoke(messages)
+        # Stream so the UI receives tokens (via astream_events) as they arrive
+        parts: list[str] = []
+        async for chunk in llm.astream(messages):
+            parts.append(chunk.content)
+        content = "".join(parts)
 
-    content = response.content if hasattr(response, "content") else str(response)
+        _draft_memo.pop(key, None)
+        while len(_draft_memo) >= DRAFT_MEMO_SIZE:
+            _draft_memo.pop(next(iter(_draft_memo)))
+    _draft_memo[key] = content  # mark as most recently used
 
     return {
         "messages": [AIMessage(content=f"Draft created ({len(content)} chars)")],
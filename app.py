@@ -5,9 +5,12 @@ steps nested under parent messages.  Only the final accepted proposal
 appears as a standalone chat message.
 """
 
+import asyncio
 import io
 import os
 import re
+import threading
+import time
 from datetime import datetime, timezone, timedelta
 
 import chainlit as cl
@@ -15,6 +18,8 @@ from langchain_core.messages import HumanMessage
 
 from data_layer import JsonDataLayer
 from graph.graph import build_graph, QUALITY_THRESHOLD, MAX_ITERATIONS
+from utils.llm import aclose_http_client
+from utils.run_cache import get_cached_run, store_run
 
 # ── Initialisation ───────────────────────────────────────────────────
 APP_GRAPH = build_graph()
@@ -27,6 +32,17 @@ MAJOR_NODES = frozenset(
     {"planner", "researcher", "writer", "evaluator", "output", "ask_user"}
 )
 
+# PyMuPDF keeps global state, so PDF renders from worker threads are serialised
+_PDF_LOCK = threading.Lock()
+
+# Graph runs allowed in flight at once, across all chat sessions
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "8"))
+_GRAPH_SEM = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+
+# Streamed tokens are coalesced and pushed to a step at most this often
+STREAM_FLUSH_INTERVAL = 0.05  # seconds
+STREAM_FLUSH_MAX_TOKENS = 128  # ...or sooner, once this many are waiting
+
 # Human-readable step names
 _STEP_LABELS = {
     "planner": "Planner",
@@ -65,12 +81,11 @@ def _utc_now() -> str:
     return _get_next_timestamp()
 
 
+_SCORE_EMOJIS = ("🔴", "🟡", "🟢")  # below 7, 7 to 9, 9 and above
+
+
 def _score_emoji(score: float) -> str:
-    if score >= 9.0:
-        return "🟢"
-    if score >= 7.0:
-        return "🟡"
-    return "🔴"
+    return _SCORE_EMOJIS[(score >= 7.0) + (score >= 9.0)]
 
 
 def _build_scorecard(
@@ -78,18 +93,20 @@ def _build_scorecard(
     overall_score: float,
     revision_count: int,
 ) -> str:
-    rows = "\n".join(
-        f"| {_score_emoji(v)} | {dim} | **{v}** |"
-        for dim, v in dimension_scores.items()
-    )
-    emoji = _score_emoji(overall_score)
-    return (
-        f"## {emoji} Evaluation Scorecard\n\n"
-        f"| | Dimension | Score |\n"
-        f"|---|-----------|-------|\n"
-        f"{rows}\n\n"
-        f"**Overall: {overall_score}/10** · Revision {revision_count}/{MAX_ITERATIONS}"
-    )
+    # One join over every line, rather than joining the rows and then
+    # splicing them into a second formatted string
+    lines = [
+        f"## {_score_emoji(overall_score)} Evaluation Scorecard\n",
+        "| | Dimension | Score |",
+        "|---|-----------|-------|",
+        *[
+            f"| {_score_emoji(v)} | {dim} | **{v}** |"
+            for dim, v in dimension_scores.items()
+        ],
+        "",
+        f"**Overall: {overall_score}/10** · Revision {revision_count}/{MAX_ITERATIONS}",
+    ]
+    return "\n".join(lines)
 
 
 async def _end_step(step: cl.Step) -> None:
@@ -98,9 +115,16 @@ async def _end_step(step: cl.Step) -> None:
     await step.update()
 
 
-async def _make_step(name: str, parent_id: str) -> cl.Step:
+async def _flush_tokens(step: cl.Step, buffer: list[str]) -> None:
+    """Send buffered tokens to *step* as a single update and clear the buffer."""
+    if buffer:
+        await step.stream_token("".join(buffer))
+        buffer.clear()
+
+
+async def _make_step(name: str, parent_id: str, language: str | None = None) -> cl.Step:
     """Create, register, and send a step nested under *parent_id*."""
-    step = cl.Step(name=name, type="run")
+    step = cl.Step(name=name, type="run", language=language)
     step.parent_id = parent_id
     step.created_at = _get_next_timestamp()
     await step.send()
@@ -108,42 +132,46 @@ async def _make_step(name: str, parent_id: str) -> cl.Step:
 
 
 # ── Starters ─────────────────────────────────────────────────────────
+# Built once at import; the starter prompts never change between sessions
+_STARTERS = [
+    cl.Starter(
+        label="📋 Grant Proposal",
+        message="Act as Sarah Al-Fayed, Country Director at MSF. Write a grant proposal titled 'Operation Clean Water: Yemen 2026' to the Bill & Melinda Gates Foundation for a $750K emergency cholera intervention. Proposed start date: March 1st, 2026. Contact: s.alfayed@msf.org / +967-1-234567. Provide 5,000 cholera kits, deploy 12 medical staff, and initiate a 6-month budget (80% medical, 20% logistics).",
+    ),
+    cl.Starter(
+        label="💼 Business Plan",
+        message='Act as Alex Chen, Founder of LedgerLoop (Series A Fintech). Write a business plan pitching "Stripe for Corporate Bonds" to Sequoia Capital. Use a tech stack based on Rust/Solana; detail a 12-month roadmap (Q1-Q4); and justify a $15M ask broken down into 60% R&D, 30% Ops, and 10% Marketing.',
+    ),
+    cl.Starter(
+        label="⚙️ Technical Proposal",
+        message='Act as TechFlow Solutions (AWS Partner). Write a technical proposal for First Midwest Bank to migrate from on-prem mainframes to AWS Cloud. Scale: 1500 VMs and 100TB database. Propose a phased "6 Rs" framework; guarantee SOC2 Type II compliance; and detail a zero-downtime cutover strategy.',
+    ),
+    cl.Starter(
+        label="💰 Sales Proposal",
+        message='Act as a Salesforce Enterprise AE. Write a closing proposal for Mayo Clinic to adopt Health Cloud. Target a 15% reduction in patient wait times; include a 12-month contract; and present tiered pricing for 1,000 seats including a "Co-Innovation Lab" partnership.',
+    ),
+    cl.Starter(
+        label="📅 Project Proposal",
+        message='Act as ThoughtWorks (Agile Dev Shop). Write a project proposal to build the MVP for "NeoBank". Include a 20-week total project duration with sprint-based delivery for a mobile app and admin dashboard; define the "Definition of Done" for the MVP; and use an embedded client product owner model.',
+    ),
+    cl.Starter(
+        label="🔬 Research Proposal",
+        message="Act as Pfizer Oncology R&D. Write a Phase 3 Clinical Trial Protocol for Drug-X (Lung Cancer). Study 1,200 patients over 36 months; define primary endpoints for Overall Survival vs. Progression-Free Survival; and detail the global site selection and DSMB governance strategy.",
+    ),
+    cl.Starter(
+        label="🤝 Partnership Proposal",
+        message="Act as Spotify Business Development. Write a partnership proposal to Uber. Include cross-platform authentication and weekly co-marketing syncs; propose a 10% revenue share on bookings; and focus on the technical API integration allowing riders to control the car stereo via Spotify.",
+    ),
+    cl.Starter(
+        label="📝 General Proposal",
+        message='Act as Jessica Pearson, VP of People. Write an internal proposal to the Board of Directors for a 12-week "4-Day Work Week" pilot. KPIs: 20% increase in productivity, 15% reduction in turnover; trial the Monday-Thursday schedule in Engineering; and address accountability measures.',
+    ),
+]
+
+
 @cl.set_starters
 async def set_starters():
-    return [
-        cl.Starter(
-            label="📋 Grant Proposal",
-            message="Act as Sarah Al-Fayed, Country Director at MSF. Write a grant proposal titled 'Operation Clean Water: Yemen 2026' to the Bill & Melinda Gates Foundation for a $750K emergency cholera intervention. Proposed start date: March 1st, 2026. Contact: s.alfayed@msf.org / +967-1-234567. Provide 5,000 cholera kits, deploy 12 medical staff, and initiate a 6-month budget (80% medical, 20% logistics).",
-        ),
-        cl.Starter(
-            label="💼 Business Plan",
-            message='Act as Alex Chen, Founder of LedgerLoop (Series A Fintech). Write a business plan pitching "Stripe for Corporate Bonds" to Sequoia Capital. Use a tech stack based on Rust/Solana; detail a 12-month roadmap (Q1-Q4); and justify a $15M ask broken down into 60% R&D, 30% Ops, and 10% Marketing.',
-        ),
-        cl.Starter(
-            label="⚙️ Technical Proposal",
-            message='Act as TechFlow Solutions (AWS Partner). Write a technical proposal for First Midwest Bank to migrate from on-prem mainframes to AWS Cloud. Scale: 1500 VMs and 100TB database. Propose a phased "6 Rs" framework; guarantee SOC2 Type II compliance; and detail a zero-downtime cutover strategy.',
-        ),
-        cl.Starter(
-            label="💰 Sales Proposal",
-            message='Act as a Salesforce Enterprise AE. Write a closing proposal for Mayo Clinic to adopt Health Cloud. Target a 15% reduction in patient wait times; include a 12-month contract; and present tiered pricing for 1,000 seats including a "Co-Innovation Lab" partnership.',
-        ),
-        cl.Starter(
-            label="📅 Project Proposal",
-            message='Act as ThoughtWorks (Agile Dev Shop). Write a project proposal to build the MVP for "NeoBank". Include a 20-week total project duration with sprint-based delivery for a mobile app and admin dashboard; define the "Definition of Done" for the MVP; and use an embedded client product owner model.',
-        ),
-        cl.Starter(
-            label="🔬 Research Proposal",
-            message="Act as Pfizer Oncology R&D. Write a Phase 3 Clinical Trial Protocol for Drug-X (Lung Cancer). Study 1,200 patients over 36 months; define primary endpoints for Overall Survival vs. Progression-Free Survival; and detail the global site selection and DSMB governance strategy.",
-        ),
-        cl.Starter(
-            label="🤝 Partnership Proposal",
-            message="Act as Spotify Business Development. Write a partnership proposal to Uber. Include cross-platform authentication and weekly co-marketing syncs; propose a 10% revenue share on bookings; and focus on the technical API integration allowing riders to control the car stereo via Spotify.",
-        ),
-        cl.Starter(
-            label="📝 General Proposal",
-            message='Act as Jessica Pearson, VP of People. Write an internal proposal to the Board of Directors for a 12-week "4-Day Work Week" pilot. KPIs: 20% increase in productivity, 15% reduction in turnover; trial the Monday-Thursday schedule in Engineering; and address accountability measures.',
-        ),
-    ]
+    return _STARTERS
 
 
 # ── Auth & data layer ────────────────────────────────────────────────
@@ -160,6 +188,12 @@ def get_data_layer():
     return JsonDataLayer()
 
 
+@cl.on_app_shutdown
+async def shutdown():
+    """Release the pooled Groq connections."""
+    await aclose_http_client()
+
+
 # ── Chat lifecycle ───────────────────────────────────────────────────
 
 
@@ -203,6 +237,8 @@ async def main(message: cl.Message):
             # state.next is ("researcher",) — not ("ask_user",).
             if cl.user_session.get("awaiting_planner_answers"):
                 cl.user_session.set("awaiting_planner_answers", False)
+                # The result now depends on these answers, so don't cache it
+                cl.user_session.set("cache_task", None)
                 # User answered planner questions — merge into task
                 existing_task = state.values.get("task", "")
                 updated_task = (
@@ -219,8 +255,9 @@ async def main(message: cl.Message):
                 intent = cl.user_session.get("intent")
                 as_node = "researcher"  # Default: update researcher’s feedback but move to writer
 
-                if feedback.startswith("✅ Proceeding"):
+                if intent == "proceed":
                     feedback = ""
+                    cl.user_session.set("intent", None)
                 elif intent == "reresearch":
                     # Special case: Loop back to researcher node by updating as 'planner'
                     as_node = "planner"
@@ -229,17 +266,64 @@ async def main(message: cl.Message):
                     # Regular case: feedback is for the writer, proceed normally
                     cl.user_session.set("intent", None)
 
+                if feedback:
+                    cl.user_session.set("cache_task", None)
                 await graph.aupdate_state(
                     config, {"user_feedback": feedback}, as_node=as_node
                 )
             stream = graph.astream_events(None, config, version="v2")
+        elif cl.user_session.get("intent") == "edit" and state.values.get(
+            "research_data"
+        ):
+            # Changes requested on a finished proposal — keep the plan and
+            # research, and re-enter the graph at the writer
+            cl.user_session.set("intent", None)
+            await graph.aupdate_state(
+                config,
+                {
+                    "user_feedback": message.content,
+                    "critique": "",
+                    "revision_count": 0,
+                    "score": 0.0,
+                },
+                as_node="researcher",
+            )
+            stream = graph.astream_events(None, config, version="v2")
         else:
+            # Same request as an earlier finished run: replay it into this
+            # thread's checkpoint (so edits still work) and skip the graph.
+            # This also skips the research review checkpoint; feedback sent
+            # afterwards revises the replayed proposal as usual.
+            cached = await get_cached_run(message.content)
+            if cached is not None:
+                await graph.aupdate_state(
+                    config,
+                    {
+                        **cached,
+                        "messages": [HumanMessage(content=message.content)],
+                        "user_feedback": "",
+                    },
+                    as_node="output",
+                )
+                await cl.Message(
+                    content=(
+                        "♻️ **Served from cache.** This request matches an earlier "
+                        "finished run, so its proposal is shown as-is without new "
+                        "research. Use **Request Changes** to revise it."
+                    ),
+                    created_at=_get_next_timestamp(),
+                ).send()
+                await _send_final_proposal(cached["draft"])
+                return
+
+            cl.user_session.set("cache_task", message.content)
             inputs = {
                 "task": message.content,
                 "messages": [HumanMessage(content=message.content)],
                 "revision_count": 0,
                 "score": 0.0,
                 "user_feedback": "",
+                "research_needed": [],
                 "search_queries": [],
                 "dimension_scores": {},
                 "questions_for_user": [],
@@ -248,130 +332,142 @@ async def main(message: cl.Message):
 
         # ── Session-scoped tracking ──────────────────────────────────
         active_steps: dict[str, cl.Step] = {}
+        # Fetched once; the loop mutates this same set object in place, so
+        # the session copy stays current without a set() per event
+        processed: set = cl.user_session.get("processed_ids")
+        if processed is None:
+            processed = set()
+            cl.user_session.set("processed_ids", processed)
+        major_nodes = MAJOR_NODES  # local binding for the per-event check
+        token_buffers: dict[str, list[str]] = {}
+        last_flush: dict[str, float] = {}
         attempt = 1  # writer/evaluator attempt counter
-
-        async for event in stream:
-            kind = event["event"]
-            name = event["name"]
-            data = event["data"]
-
-            # ── Node Start ───────────────────────────────────────────
-            if kind == "on_chain_start" and name in MAJOR_NODES:
-                run_id = event.get("run_id")
-                processed = cl.user_session.get("processed_ids") or set()
-                cl.user_session.set("processed_ids", processed)
-                if run_id in processed:
-                    continue
-                processed.add(run_id)
-
-                # Skip the no-op ask_user node in the UI
-                if name == "ask_user":
-                    continue
-
-                # Parent steps directly under the user message
-                if name in ("writer", "evaluator"):
-                    attempt = 1
-
-                # Choose label
-                if name == "writer":
-                    label = _writer_label(attempt)
-                elif name == "evaluator":
-                    label = _evaluator_label(attempt)
-                else:
-                    label = _STEP_LABELS.get(name, name.capitalize())
-
-                step = await _make_step(label, message.id)
-                active_steps[name] = step
-
-            # ── LLM Streaming ────────────────────────────────────────
-            elif kind == "on_chat_model_stream":
-                chunk_content = data["chunk"].content
-                if not chunk_content:
-                    continue
-                node = event.get("metadata", {}).get("langgraph_node")
-                if node and node in active_steps:
-                    await active_steps[node].stream_token(chunk_content)
-
-            # ── Node End ─────────────────────────────────────────────
-            elif kind == "on_chain_end" and name in MAJOR_NODES:
-                # Handle ask_user node — show planner questions
-                if name == "ask_user":
-                    final_state = graph.get_state(config)
-                    questions = final_state.values.get("questions_for_user", [])
-                    if questions:
-                        await _show_planner_questions(questions)
-                        # Mark that the next user message is an answer to planner
-                        # questions, not researcher feedback.
-                        cl.user_session.set("awaiting_planner_answers", True)
+        # Captured from node outputs so the checkpoint needn't be re-read
+        planner_questions: list[str] | None = None
+        final_draft = ""
+        output_path = None
+        finished = False
+
+        # Bound graph runs across all sessions so a burst of users can't
+        # flood the LLM provider (one run per session is is_processing's job)
+        async with _GRAPH_SEM:
+            async for event in stream:
+                kind = event["event"]
+
+                # ── LLM Streaming (hot path: one event per token) ────────
+                if kind == "on_chat_model_stream":
+                    chunk_content = event["data"]["chunk"].content
+                    if not chunk_content:
+                        continue
+                    metadata = event.get("metadata")
+                    node = metadata and metadata.get("langgraph_node")
+                    step = active_steps.get(node)
+                    if step is not None:
+                        buffer = token_buffers[node]
+                        buffer.append(chunk_content)
+                        now = time.monotonic()
+                        if (
+                            now - last_flush.get(node, 0.0) >= STREAM_FLUSH_INTERVAL
+                            or len(buffer) >= STREAM_FLUSH_MAX_TOKENS
+                        ):
+                            await _flush_tokens(step, buffer)
+                            last_flush[node] = now
                     continue
 
-                if name not in active_steps:
+                name = event["name"]
+                if name not in major_nodes:
                     continue
 
-                step = active_steps.pop(name)
-                output = data.get("output")
-
-                if name == "planner":
-                    step.output = f"**Plan Generated**\n\n{output.get('plan', '')}"
-                    await _end_step(step)
-
-                elif name == "researcher":
-                    await _finish_researcher(step, output)
-
-                elif name == "writer":
-                    step.output = output.get("draft", "")
-                    await _end_step(step)
-
-                elif name == "evaluator":
-                    await _finish_evaluator(step, output)
-                    attempt += 1
-
-                elif name == "output":
-                    await _finish_output(step, output)
+                # ── Node Start ───────────────────────────────────────────
+                if kind == "on_chain_start":
+                    run_id = event.get("run_id")
+                    if run_id in processed:
+                        continue
+                    processed.add(run_id)
+
+                    # Skip the no-op ask_user node in the UI
+                    if name == "ask_user":
+                        continue
+
+                    # Parent steps directly under the user message
+                    if name in ("writer", "evaluator"):
+                        attempt = 1
+
+                    # Choose label
+                    if name == "writer":
+                        label = _writer_label(attempt)
+                    elif name == "evaluator":
+                        label = _evaluator_label(attempt)
+                    else:
+                        label = _STEP_LABELS.get(name, name.capitalize())
+
+                    # The writer streams as plain text so the UI isn't re-parsing
+                    # a growing markdown document on every flush
+                    step = await _make_step(
+                        label, message.id, language="text" if name == "writer" else None
+                    )
+                    active_steps[name] = step
+                    # Created here so the per-token path is a plain lookup
+                    token_buffers[name] = []
+
+                # ── Node End ─────────────────────────────────────────────
+                elif kind == "on_chain_end":
+                    # Handle ask_user node — show planner questions
+                    if name == "ask_user":
+                        questions = planner_questions
+                        if questions is None:
+                            snapshot = graph.get_state(config)
+                            questions = snapshot.values.get("questions_for_user", [])
+                        if questions:
+                            await _show_planner_questions(questions)
+                            # Mark that the next user message is an answer to planner
+                            # questions, not researcher feedback.
+                            cl.user_session.set("awaiting_planner_answers", True)
+                        continue
+
+                    if name not in active_steps:
+                        continue
+
+                    step = active_steps.pop(name)
+                    await _flush_tokens(step, token_buffers.pop(name))
+                    output = event["data"].get("output")
+
+                    if name == "planner":
+                        planner_questions = output.get("questions_for_user", [])
+                        step.output = f"**Plan Generated**\n\n{output.get('plan', '')}"
+                        await _end_step(step)
+
+                    elif name == "researcher":
+                        await _finish_researcher(step, output)
+
+                    elif name == "writer":
+                        final_draft = output.get("draft", "")
+                        step.output = final_draft
+                        step.language = None  # render the finished draft as markdown
+                        await _end_step(step)
+
+                    elif name == "evaluator":
+                        await _finish_evaluator(step, output)
+                        attempt += 1
+
+                    elif name == "output":
+                        finished = True
+                        output_path = output.get("output_path")
+                        await _finish_output(step, output)
 
         # ── After stream: display the final proposal ─────────────────
-        final_state = graph.get_state(config)
-        draft = final_state.values.get("draft", "")
-
-        # Only show when graph has fully completed (no pending interrupt)
-        if draft and not final_state.next:
-            elements = [
-                cl.File(
-                    name="proposal_final.md",
-                    content=draft.encode("utf-8"),
-                    display="inline",
-                ),
-            ]
-
-            # Generate PDF — don't let export errors block the message
-            try:
-                elements.append(
-                    cl.File(
-                        name="proposal_final.pdf",
-                        content=_draft_to_pdf_bytes(draft),
-                        display="inline",
-                    )
-                )
-            except Exception as e:
-                print(f"[WARNING] PDF generation failed: {e}")
-
-            # Generate DOCX
-            try:
-                elements.append(
-                    cl.File(
-                        name="proposal_final.docx",
-                        content=_draft_to_docx_bytes(draft),
-                        display="inline",
-                    )
-                )
-            except Exception as e:
-                print(f"[WARNING] DOCX generation failed: {e}")
-
-            await cl.Message(
-                content=f"# 📄 Final Proposal\n\n{draft}\n\n---\n📥 **Download your proposal:** Use the attachments below to download as **PDF** or **DOCX**.",
-                elements=elements,
-                created_at=_get_next_timestamp(),
-            ).send()
+        # Only show when the output node ran, i.e. the graph fully completed
+        if finished:
+            draft = final_draft
+            cache_task = cl.user_session.get("cache_task")
+            if cache_task or not draft:
+                values = graph.get_state(config).values
+                draft = draft or values.get("draft", "")
+                if cache_task:
+                    cl.user_session.set("cache_task", None)
+                    await store_run(cache_task, values)
+            if draft:
+                await _send_final_proposal(draft, output_path)
     finally:
         cl.user_session.set("is_processing", False)
 
@@ -379,45 +475,41 @@ async def main(message: cl.Message):
 # ── Download helpers ─────────────────────────────────────────────────
 
 
+# Aesthetic Minimalist CSS for PDF exports
+_PDF_CSS = """
+body { font-family: sans-serif; font-size: 11pt; line-height: 1.6; color: #1a1a1a; }
+h1 { font-size: 20pt; color: #1a1a1a; margin-top: 18pt; margin-bottom: 8pt; }
+h2 { font-size: 16pt; color: #2C3E50; margin-top: 16pt; margin-bottom: 6pt; }
+h3 { font-size: 13pt; color: #34495E; margin-top: 12pt; margin-bottom: 4pt; }
+p  { margin: 0 0 6pt 0; }
+hr { border: none; border-top: 1px solid #bbb; margin: 12pt 0; }
+table { margin: 10pt 0 14pt 0; font-size: 10pt; width: 100%; border-collapse: separate; border-spacing: 0; }
+thead th { background-color: #f7f9fa; color: #2C3E50; font-weight: bold; text-align: left; padding: 8pt; }
+thead { border-bottom: 2pt solid #2C3E50; }
+td { padding: 8pt; border-bottom: 0.5pt solid #e1e4e8; vertical-align: top; }
+h1, h2, h3 { page-break-after: avoid; }
+p { orphans: 3; widows: 3; }
+pre { page-break-inside: avoid; }
+"""
+
+# Inline **bold** / *italic* / `code` spans, bullets and headings for DOCX exports
+_INLINE_MD_RE = re.compile(r"(\*\*(.+?)\*\*|\*(.+?)\*|`(.+?)`|([^*`]+))")
+_BULLET_RE = re.compile(r"^[-*]\s")
+_HEADING_LEVELS = {"#": 1, "##": 2, "###": 3}
+
+
 def _draft_to_pdf_bytes(draft: str) -> bytes:
     """Convert a markdown draft string to PDF bytes using markdown-pdf (PyMuPDF)."""
-    import tempfile
-    import os
     from markdown_pdf import MarkdownPdf, Section
 
-    # Aesthetic Minimalist CSS
-    css = """
-    body { font-family: sans-serif; font-size: 11pt; line-height: 1.6; color: #1a1a1a; }
-    h1 { font-size: 20pt; color: #1a1a1a; margin-top: 18pt; margin-bottom: 8pt; }
-    h2 { font-size: 16pt; color: #2C3E50; margin-top: 16pt; margin-bottom: 6pt; }
-    h3 { font-size: 13pt; color: #34495E; margin-top: 12pt; margin-bottom: 4pt; }
-    p  { margin: 0 0 6pt 0; }
-    hr { border: none; border-top: 1px solid #bbb; margin: 12pt 0; }
-    table { margin: 10pt 0 14pt 0; font-size: 10pt; width: 100%; border-collapse: separate; border-spacing: 0; }
-    thead th { background-color: #f7f9fa; color: #2C3E50; font-weight: bold; text-align: left; padding: 8pt; }
-    thead { border-bottom: 2pt solid #2C3E50; }
-    td { padding: 8pt; border-bottom: 0.5pt solid #e1e4e8; vertical-align: top; }
-    h1, h2, h3 { page-break-after: avoid; }
-    p { orphans: 3; widows: 3; }
-    pre { page-break-inside: avoid; }
-    """
-
-    pdf = MarkdownPdf(toc_level=0)
-    pdf.add_section(Section(draft, toc=False), user_css=css)
-    pdf.meta["title"] = "Proposal"
-
-    # markdown-pdf requires saving to a file; read bytes back
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        tmp_path = tmp.name
-    try:
-        pdf.save(tmp_path)
-        with open(tmp_path, "rb") as f:
-            return f.read()
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+    # PyMuPDF saves straight into a file-like object, so nothing touches disk
+    buffer = io.BytesIO()
+    with _PDF_LOCK:
+        pdf = MarkdownPdf(toc_level=0)
+        pdf.add_section(Section(draft, toc=False), user_css=_PDF_CSS)
+        pdf.meta["title"] = "Proposal"
+        pdf.save(buffer)
+    return buffer.getvalue()
 
 
 def _draft_to_docx_bytes(draft: str) -> bytes:
@@ -434,8 +526,10 @@ def _draft_to_docx_bytes(draft: str) -> bytes:
 
     def _add_run_with_inline(para, text: str):
         """Parse **bold** / *italic* inline and add runs."""
-        pattern = re.compile(r"(\*\*(.+?)\*\*|\*(.+?)\*|`(.+?)`|([^*`]+))")
-        for m in pattern.finditer(text):
+        if "*" not in text and "`" not in text:  # plain prose, nothing to parse
+            para.add_run(text)
+            return
+        for m in _INLINE_MD_RE.finditer(text):
             if m.group(2):  # **bold**
                 run = para.add_run(m.group(2))
                 run.bold = True
@@ -448,30 +542,80 @@ def _draft_to_docx_bytes(draft: str) -> bytes:
             elif m.group(5):  # plain text
                 para.add_run(m.group(5))
 
+    add_heading = document.add_heading
+    add_paragraph = document.add_paragraph
     for line in draft.splitlines():
         stripped = line.rstrip()
-        if stripped.startswith("# "):
-            document.add_heading(stripped[2:], level=1)
-        elif stripped.startswith("## "):
-            document.add_heading(stripped[3:], level=2)
-        elif stripped.startswith("### "):
-            document.add_heading(stripped[4:], level=3)
+        if not stripped:
+            add_paragraph("")
+            continue
+        # One dict lookup on the leading token instead of a startswith chain
+        marker, sep, heading = stripped.partition(" ")
+        level = _HEADING_LEVELS.get(marker) if sep else None
+        if level:
+            add_heading(heading, level=level)
         elif stripped.startswith("---"):
-            document.add_paragraph("─" * 60)
-        elif re.match(r"^[-*]\s", stripped):
-            para = document.add_paragraph(style="List Bullet")
-            _add_run_with_inline(para, stripped[2:])
-        elif stripped == "":
-            document.add_paragraph("")
+            add_paragraph("─" * 60)
+        elif _BULLET_RE.match(stripped):
+            _add_run_with_inline(add_paragraph(style="List Bullet"), stripped[2:])
         else:
-            para = document.add_paragraph()
-            _add_run_with_inline(para, stripped)
+            _add_run_with_inline(add_paragraph(), stripped)
 
     buf = io.BytesIO()
     document.save(buf)
     return buf.getvalue()
 
 
+# ── Final proposal helper ────────────────────────────────────────────
+async def _send_final_proposal(draft: str, output_path: str | None = None) -> None:
+    """Post the finished proposal, then attach its PDF/DOCX exports."""
+    # Serve the file the output node already saved rather than
+    # re-encoding the draft into the message payload
+    md_source = (
+        {"path": output_path}
+        if output_path and await asyncio.to_thread(os.path.exists, output_path)
+        else {"content": draft.encode("utf-8")}
+    )
+    # Start the PDF and DOCX renders in worker threads, post the
+    # proposal straight away, then attach each export once it's ready
+    exports = {
+        ext: asyncio.create_task(asyncio.to_thread(render, draft))
+        for ext, render in (
+            ("pdf", _draft_to_pdf_bytes),
+            ("docx", _draft_to_docx_bytes),
+        )
+    }
+
+    final_msg = await cl.Message(
+        content=f"# 📄 Final Proposal\n\n{draft}\n\n---\n📥 **Download your proposal:** Use the attachments below to download as **PDF** or **DOCX**.",
+        elements=[
+            cl.File(name="proposal_final.md", display="inline", **md_source),
+        ],
+        actions=[
+            cl.Action(
+                name="edit_requirements",
+                value="edit",
+                label="✏️ Request Changes",
+                payload={"value": "edit"},
+            )
+        ],
+        created_at=_get_next_timestamp(),
+    ).send()
+
+    # Don't let export errors affect the proposal already shown
+    for ext, task in exports.items():
+        try:
+            content = await task
+        except Exception as e:
+            print(f"[WARNING] {ext.upper()} generation failed: {e}")
+            continue
+        await cl.File(
+            name=f"proposal_final.{ext}",
+            content=content,
+            display="inline",
+        ).send(for_id=final_msg.id)
+
+
 # ── Planner questions helper ─────────────────────────────────────────
 async def _show_planner_questions(questions: list[str]) -> None:
     """Display the planner's questions to the user for HITL input."""
@@ -488,6 +632,31 @@ async def _show_planner_questions(questions: list[str]) -> None:
 
 
 # ── Node-end helpers ─────────────────────────────────────────────────
+RESEARCH_PREVIEW_CHARS = 600  # research brief shown in the checkpoint message
+
+# Actions offered at the research checkpoint (HITL)
+_RESEARCH_ACTION_SPECS = (
+    {
+        "name": "proceed",
+        "value": "proceed",
+        "label": "✅ Proceed to Write",
+        "payload": {"value": "proceed"},
+    },
+    {
+        "name": "edit_requirements",
+        "value": "edit",
+        "label": "✏️ Edit Requirements",
+        "payload": {"value": "edit"},
+    },
+    {
+        "name": "reresearch",
+        "value": "reresearch",
+        "label": "🔄 Re-research",
+        "payload": {"value": "reresearch"},
+    },
+)
+
+
 async def _finish_researcher(step: cl.Step, output: dict) -> None:
     """Finalise the researcher step, then send the HITL checkpoint."""
     research_data = output.get("research_data", "")
@@ -503,30 +672,17 @@ async def _finish_researcher(step: cl.Step, output: dict) -> None:
         else ""
     )
 
-    preview = research_data[:600].rstrip()
-    if len(research_data) > 600:
+    # Only the head of the brief goes in the chat message (the full text is
+    # in the step above), cut at a word boundary
+    preview = research_data.rstrip()
+    if len(preview) > RESEARCH_PREVIEW_CHARS:
+        head = preview[:RESEARCH_PREVIEW_CHARS]
+        cut = head.rfind(" ")
+        preview = (head[:cut] if cut > 0 else head).rstrip()
         preview += "\n\n*(…see full brief in the step above)*"
 
-    actions = [
-        cl.Action(
-            name="proceed",
-            value="proceed",
-            label="✅ Proceed to Write",
-            payload={"value": "proceed"},
-        ),
-        cl.Action(
-            name="edit_requirements",
-            value="edit",
-            label="✏️ Edit Requirements",
-            payload={"value": "edit"},
-        ),
-        cl.Action(
-            name="reresearch",
-            value="reresearch",
-            label="🔄 Re-research",
-            payload={"value": "reresearch"},
-        ),
-    ]
+    # Fresh instances each time: every Action gets its own id on creation
+    actions = [cl.Action(**spec) for spec in _RESEARCH_ACTION_SPECS]
 
     await cl.Message(
         content=(
@@ -569,7 +725,8 @@ async def _finish_evaluator(step: cl.Step, output: dict) -> None:
 
 async def _finish_output(step: cl.Step, output: dict) -> None:
     """Finalise the output step (proposal display happens after the stream)."""
-    step.output = "Saved to disk."
+    path = output.get("output_path")
+    step.output = f"Saved to `{path}`." if path else "Saved to disk."
     await _end_step(step)
 
 
@@ -579,6 +736,7 @@ async def on_proceed(action: cl.Action):
     if cl.user_session.get("is_processing"):
         return
     await action.remove()
+    cl.user_session.set("intent", "proceed")
     # Send a visible message so it has a valid ID for nesting steps
     msg = cl.Message(
         content="✅ Proceeding to write the proposal...",
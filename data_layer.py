@@ -1,15 +1,21 @@
 """JSON-file–based Chainlit data layer.
 
 Stores users and conversation threads as JSON files under `.chat_data/`.
-Zero external dependencies — uses only the Python standard library.
+Each thread is a small header file (`{id}.json`) plus an append-only
+step log (`{id}.ndjson`, one step per line), so persisting a step costs
+one appended line rather than a rewrite of the whole thread; the log is
+compacted back to the live steps when the thread is loaded or rewritten.
+A single index file holds every thread's header for `list_threads`.
+Serialisation uses orjson; everything else is the Python standard library.
 """
 
 import asyncio
-import json
 import os
+import time
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
+import orjson
 from chainlit.data import BaseDataLayer
 from chainlit.types import (
     Feedback,
@@ -26,7 +32,30 @@ _ROOT = os.path.join(os.path.dirname(__file__), ".chat_data")
 _USERS_FILE = os.path.join(_ROOT, "users.json")
 _THREADS_DIR = os.path.join(_ROOT, "threads")
 
-_lock = asyncio.Lock()
+# One lock per thread file, so sessions on different threads don't queue
+# behind each other; users.json has its own.  Idle locks beyond
+# THREAD_LOCKS_SIZE are dropped, oldest first
+THREAD_LOCKS_SIZE = 256
+_thread_locks: dict[str, asyncio.Lock] = {}
+_users_lock = asyncio.Lock()
+_index_lock = asyncio.Lock()
+
+# Recent reads served from memory: the auth callback looks up the same user
+# on every request, and a thread is re-read on each resume/author check.
+# Both are small LRUs; insertion order doubles as LRU order
+USER_CACHE_TTL = 60.0  # seconds
+THREAD_CACHE_TTL = 5.0  # seconds
+USER_CACHE_SIZE = 64
+THREAD_CACHE_SIZE = 32
+_user_cache: dict[str, tuple[float, PersistedUser]] = {}
+_thread_cache: dict[str, tuple[float, dict]] = {}
+
+# A file this size or smaller can hold nothing beyond "{}"/"[]"
+_EMPTY_FILE_SIZE = 2
+
+# Like json.dump(default=str): non-string keys are allowed, and other
+# non-JSON values (passed through default=str) are stored as strings
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
 
 
 # ── Disk helpers ─────────────────────────────────────────────────────
@@ -39,24 +68,204 @@ def _ensure_dirs() -> None:
 def _read_json(path: str) -> dict | list:
     if not os.path.exists(path):
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def _write_json(path: str, data: dict | list) -> None:
     _ensure_dirs()
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, default=str)
+    # Write aside and swap in, so a crash never leaves a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            orjson.dumps(data, default=str, option=_JSON_OPTIONS | orjson.OPT_INDENT_2)
+        )
+    os.replace(tmp_path, path)
+
+
+def _append_json(path: str, data: dict) -> None:
+    _ensure_dirs()
+    with open(path, "ab") as f:
+        f.write(orjson.dumps(data, default=str, option=_JSON_OPTIONS) + b"\n")
+
+
+def _read_steps(
+    path: str, initial: list[dict] | None = None
+) -> tuple[list[dict], int]:
+    """Replay a step log over *initial*: later entries win for the same id.
+
+    Updates (``_update`` entries) to a step that was never created are
+    dropped.  Returns the live steps and the number of log lines replayed.
+    """
+    steps = {s.get("id"): s for s in initial or []}
+    lines = 0
+    if not os.path.exists(path):
+        return list(steps.values()), lines
+    with open(path, "rb") as f:
+        for line in f:
+            lines += 1
+            try:
+                entry = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue  # torn final line from an interrupted append
+            step_id = entry.get("id")
+            if entry.get("_deleted"):
+                steps.pop(step_id, None)
+            elif not entry.pop("_update", False) or step_id in steps:
+                steps[step_id] = entry
+    return list(steps.values()), lines
+
+
+def _write_steps(path: str, steps: list[dict]) -> None:
+    """Replace the step log at *path* with one line per step."""
+    _ensure_dirs()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(
+            orjson.dumps(step, default=str, option=_JSON_OPTIONS) + b"\n"
+            for step in steps
+        )
+    os.replace(tmp_path, path)
+
+
+def _load_thread(thread_id: str, compact: bool = False) -> dict | None:
+    """Read a thread header with its steps, or None if it doesn't exist.
+
+    With *compact*, a log holding superseded or deleted entries (or a
+    header still holding inline steps) is rewritten to just the live steps.
+    """
+    path = _thread_path(thread_id)
+    thread = _read_json(path)
+    if not thread:
+        return None
+    inline = thread.pop("steps", None) or []
+    log_path = _steps_path(thread_id)
+    steps, lines = _read_steps(log_path, inline)
+    if compact and (inline or lines > len(steps)):
+        _write_steps(log_path, steps)
+        if inline:
+            _write_json(path, thread)
+    thread["steps"] = steps
+    return thread
+
+
+def _list_thread_ids() -> list[str]:
+    """Ids of thread files worth opening; empty stubs are skipped on size alone."""
+    _ensure_dirs()
+    with os.scandir(_THREADS_DIR) as entries:
+        return [
+            e.name[: -len(".json")]
+            for e in entries
+            if e.name.endswith(".json") and e.stat().st_size > _EMPTY_FILE_SIZE
+        ]
+
+
+def _remove_files(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# File I/O runs in a worker thread so reads/writes never block the event loop
+async def _aread_json(path: str) -> dict | list:
+    return await asyncio.to_thread(_read_json, path)
+
+
+async def _awrite_json(path: str, data: dict | list) -> None:
+    await asyncio.to_thread(_write_json, path, data)
+
+
+async def _aappend_json(path: str, data: dict) -> None:
+    await asyncio.to_thread(_append_json, path, data)
+
+
+async def _aexists(path: str) -> bool:
+    return await asyncio.to_thread(os.path.exists, path)
+
+
+async def _aload_thread(thread_id: str, compact: bool = False) -> dict | None:
+    return await asyncio.to_thread(_load_thread, thread_id, compact)
 
 
 def _thread_path(thread_id: str) -> str:
     return os.path.join(_THREADS_DIR, f"{thread_id}.json")
 
 
+def _steps_path(thread_id: str) -> str:
+    return os.path.join(_THREADS_DIR, f"{thread_id}.ndjson")
+
+
+def _cached(cache: dict, key: str, ttl: float):
+    """Return the value cached under *key* if it is younger than *ttl*.
+
+    Expired entries are dropped; a hit is marked as most recently used.
+    """
+    entry = cache.pop(key, None)
+    if entry is None or time.monotonic() - entry[0] >= ttl:
+        return None
+    cache[key] = entry
+    return entry[1]
+
+
+def _cache_put(cache: dict, key: str, value, size: int) -> None:
+    """Store *value* under *key*, evicting the least recently used entries."""
+    cache.pop(key, None)
+    while len(cache) >= size:
+        cache.pop(next(iter(cache)))
+    cache[key] = (time.monotonic(), value)
+
+
+def _thread_lock(thread_id: str) -> asyncio.Lock:
+    """Return the lock guarding *thread_id*'s files."""
+    lock = _thread_locks.pop(thread_id, None) or asyncio.Lock()
+    if len(_thread_locks) >= THREAD_LOCKS_SIZE:
+        # A lock nobody holds has no waiters either, so it is safe to drop
+        for idle in [k for k, v in _thread_locks.items() if not v.locked()]:
+            del _thread_locks[idle]
+            if len(_thread_locks) < THREAD_LOCKS_SIZE:
+                break
+    _thread_locks[thread_id] = lock
+    return lock
+
+
+def _index_path() -> str:
+    return os.path.join(_ROOT, "threads_index.json")
+
+
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+# ── Thread index ─────────────────────────────────────────────────────
+# thread_id → header (everything but steps), so list_threads reads one
+# file instead of every thread's
+
+
+async def _load_index() -> dict[str, dict]:
+    """Return the thread index, building it from the thread files if missing."""
+    path = _index_path()
+    if await _aexists(path):
+        return await _aread_json(path)
+    index = {}
+    for thread_id in await asyncio.to_thread(_list_thread_ids):
+        thread = await _aread_json(_thread_path(thread_id))
+        if thread:
+            index[thread_id] = {k: v for k, v in thread.items() if k != "steps"}
+    await _awrite_json(path, index)
+    return index
+
+
+async def _index_thread(thread_id: str, thread: dict | None) -> None:
+    """Upsert *thread*'s header into the index, or drop it if None."""
+    async with _index_lock:
+        index = await _load_index()
+        if thread is None:
+            index.pop(thread_id, None)
+        else:
+            index[thread_id] = {k: v for k, v in thread.items() if k != "steps"}
+        await _awrite_json(_index_path(), index)
+
+
 # ── Data layer ───────────────────────────────────────────────────────
 
 
@@ -66,29 +275,35 @@ class JsonDataLayer(BaseDataLayer):
     # ── Users ────────────────────────────────────────────────────────
 
     async def get_user(self, identifier: str) -> Optional[PersistedUser]:
-        async with _lock:
-            users = _read_json(_USERS_FILE)
+        user = _cached(_user_cache, identifier, USER_CACHE_TTL)
+        if user is not None:
+            return user
+        async with _users_lock:
+            users = await _aread_json(_USERS_FILE)
         u = users.get(identifier)
         if not u:
             return None
-        return PersistedUser(
+        user = PersistedUser(
             id=u["id"],
             identifier=identifier,
             metadata=u.get("metadata", {}),
             createdAt=u.get("createdAt", _now_iso()),
         )
+        _cache_put(_user_cache, identifier, user, USER_CACHE_SIZE)
+        return user
 
     async def create_user(self, user: User) -> Optional[PersistedUser]:
         now = _now_iso()
-        async with _lock:
-            users = _read_json(_USERS_FILE)
+        async with _users_lock:
+            users = await _aread_json(_USERS_FILE)
             if user.identifier not in users:
                 users[user.identifier] = {
                     "id": user.identifier,
                     "metadata": user.metadata or {},
                     "createdAt": now,
                 }
-                _write_json(_USERS_FILE, users)
+                await _awrite_json(_USERS_FILE, users)
+                _user_cache.pop(user.identifier, None)
             u = users[user.identifier]
         return PersistedUser(
             id=u["id"],
@@ -100,15 +315,25 @@ class JsonDataLayer(BaseDataLayer):
     # ── Threads ──────────────────────────────────────────────────────
 
     async def get_thread(self, thread_id: str) -> Optional[ThreadDict]:
-        path = _thread_path(thread_id)
-        async with _lock:
-            data = _read_json(path)
+        thread = _cached(_thread_cache, thread_id, THREAD_CACHE_TTL)
+        if thread is not None:
+            # Callers get their own dict and step list, as from a fresh read
+            return {**thread, "steps": list(thread["steps"])}
+        async with _thread_lock(thread_id):
+            # Loading is a good time to drop superseded log entries
+            data = await _aload_thread(thread_id, compact=True)
         if data:
             # Compat: ensure userIdentifier exists (Chainlit requires it)
             if "userIdentifier" not in data and "userId" in data:
                 data["userIdentifier"] = data["userId"]
             if "steps" in data and isinstance(data["steps"], list):
                 data["steps"].sort(key=lambda s: s.get("createdAt", ""))
+            _cache_put(
+                _thread_cache,
+                thread_id,
+                {**data, "steps": list(data["steps"])},
+                THREAD_CACHE_SIZE,
+            )
         return data or None
 
     async def get_thread_author(self, thread_id: str) -> str:
@@ -125,13 +350,14 @@ class JsonDataLayer(BaseDataLayer):
         metadata: Optional[Dict] = None,
         tags: Optional[List[str]] = None,
     ) -> None:
-        async with _lock:
+        async with _thread_lock(thread_id):
             path = _thread_path(thread_id)
-            thread = _read_json(path) or {
+            # Compacting here also moves any legacy inline steps to the log
+            thread = await _aload_thread(thread_id, compact=True) or {
                 "id": thread_id,
                 "createdAt": _now_iso(),
-                "steps": [],
             }
+            thread.pop("steps", None)
             if name is not None:
                 thread["name"] = name
             if user_id is not None:
@@ -141,40 +367,37 @@ class JsonDataLayer(BaseDataLayer):
                 thread["metadata"] = metadata
             if tags is not None:
                 thread["tags"] = tags
-            _write_json(path, thread)
+            await _awrite_json(path, thread)
+            _thread_cache.pop(thread_id, None)
+            await _index_thread(thread_id, thread)
 
     async def delete_thread(self, thread_id: str) -> None:
         path = _thread_path(thread_id)
-        async with _lock:
-            if os.path.exists(path):
-                os.remove(path)
+        async with _thread_lock(thread_id):
+            await asyncio.to_thread(_remove_files, path, _steps_path(thread_id))
+            _thread_cache.pop(thread_id, None)
+            await _index_thread(thread_id, None)
 
     async def list_threads(
         self, pagination: Pagination, filters: ThreadFilter
     ) -> PaginatedResponse[ThreadDict]:
-        _ensure_dirs()
         threads: list[ThreadDict] = []
-        async with _lock:
-            for fname in os.listdir(_THREADS_DIR):
-                if not fname.endswith(".json"):
-                    continue
-                data = _read_json(os.path.join(_THREADS_DIR, fname))
-                if not data:
-                    continue
-
-                # Compat: ensure userIdentifier exists
-                if "userIdentifier" not in data and "userId" in data:
-                    data["userIdentifier"] = data["userId"]
+        async with _index_lock:
+            index = await _load_index()
+        for data in index.values():
+            # Compat: ensure userIdentifier exists
+            if "userIdentifier" not in data and "userId" in data:
+                data["userIdentifier"] = data["userId"]
 
-                # Apply user filter
-                if filters.userId and data.get("userId") != filters.userId:
+            # Apply user filter
+            if filters.userId and data.get("userId") != filters.userId:
+                continue
+            # Apply search filter
+            if filters.search:
+                name = data.get("name", "")
+                if filters.search.lower() not in name.lower():
                     continue
-                # Apply search filter
-                if filters.search:
-                    name = data.get("name", "")
-                    if filters.search.lower() not in name.lower():
-                        continue
-                threads.append(data)
+            threads.append(data)
 
         # Sort newest-first
         threads.sort(key=lambda t: t.get("createdAt", ""), reverse=True)
@@ -205,50 +428,39 @@ class JsonDataLayer(BaseDataLayer):
         thread_id = step_dict.get("threadId")
         if not thread_id:
             return
-        async with _lock:
+        async with _thread_lock(thread_id):
             path = _thread_path(thread_id)
-            thread = _read_json(path) or {
-                "id": thread_id,
-                "createdAt": _now_iso(),
-                "steps": [],
-            }
-            steps = thread.setdefault("steps", [])
-            steps.append(step_dict)
-            _write_json(path, thread)
+            if not await _aexists(path):
+                thread = {"id": thread_id, "createdAt": _now_iso()}
+                await _awrite_json(path, thread)
+                await _index_thread(thread_id, thread)
+            await _aappend_json(_steps_path(thread_id), step_dict)
+            _thread_cache.pop(thread_id, None)
 
     async def update_step(self, step_dict: dict) -> None:
         thread_id = step_dict.get("threadId")
         if not thread_id:
             return
-        step_id = step_dict.get("id")
-        async with _lock:
-            path = _thread_path(thread_id)
-            thread = _read_json(path)
-            if not thread:
+        async with _thread_lock(thread_id):
+            if not await _aexists(_thread_path(thread_id)):
                 return
-            for i, s in enumerate(thread.get("steps", [])):
-                if s.get("id") == step_id:
-                    thread["steps"][i] = step_dict
-                    break
-            _write_json(path, thread)
+            # Appended, not rewritten; get_thread keeps the latest version
+            # and drops updates to steps that were never created
+            await _aappend_json(_steps_path(thread_id), {**step_dict, "_update": True})
+            _thread_cache.pop(thread_id, None)
 
     async def delete_step(self, step_id: str) -> None:
         # Iterate all threads (rare operation)
-        _ensure_dirs()
-        async with _lock:
-            for fname in os.listdir(_THREADS_DIR):
-                if not fname.endswith(".json"):
-                    continue
-                path = os.path.join(_THREADS_DIR, fname)
-                thread = _read_json(path)
+        for thread_id in await asyncio.to_thread(_list_thread_ids):
+            async with _thread_lock(thread_id):
+                thread = await _aload_thread(thread_id)
                 if not thread:
                     continue
-                original_len = len(thread.get("steps", []))
-                thread["steps"] = [
-                    s for s in thread.get("steps", []) if s.get("id") != step_id
-                ]
-                if len(thread["steps"]) < original_len:
-                    _write_json(path, thread)
+                if any(s.get("id") == step_id for s in thread["steps"]):
+                    await _aappend_json(
+                        _steps_path(thread_id), {"id": step_id, "_deleted": True}
+                    )
+                    _thread_cache.pop(thread_id, None)
                     return
 
     # ── Elements (files, images) ─────────────────────────────────────
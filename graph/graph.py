@@ -13,6 +13,7 @@ from __future__ import annotations
 import os
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 
 from graph.state import AgentState
@@ -52,12 +53,16 @@ def _ask_user_node(state: AgentState) -> dict:
     return {}
 
 
-def build_graph() -> StateGraph:
-    """Build and compile the proposal agent graph."""
+def build_graph(checkpointer: BaseCheckpointSaver | None = None) -> StateGraph:
+    """Build and compile the proposal agent graph.
+
+    *checkpointer* defaults to a fresh in-memory ``MemorySaver``.
+    """
     graph = StateGraph(AgentState)
 
     # Checkpointer for HITL and state persistence
-    checkpointer = MemorySaver()
+    if checkpointer is None:
+        checkpointer = MemorySaver()
 
     # Add nodes
     graph.add_node("planner", planner_node)
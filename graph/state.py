@@ -20,6 +20,8 @@ class AgentState(TypedDict):
         Detected proposal category (Grant, Business, Technical, …).
     plan : str
         Structured plan produced by the Planner agent.
+    research_needed : list[str]
+        Research topics listed by the Planner (used as search queries).
     research_data : str
         Contextual research gathered by the Research agent.
     search_queries : list[str]
@@ -38,12 +40,15 @@ class AgentState(TypedDict):
         Input from user during human-in-the-loop steps.
     questions_for_user : list[str]
         Questions the Planner needs answered (unsearchable info only).
+    output_path : str
+        Path of the Markdown file written by the Output agent.
     """
 
     messages: Annotated[list[BaseMessage], add_messages]
     task: str
     proposal_type: str
     plan: str
+    research_needed: list[str]
     research_data: str
     search_queries: list[str]
     draft: str
@@ -53,3 +58,4 @@ class AgentState(TypedDict):
     revision_count: int
     user_feedback: str
     questions_for_user: list[str]
+    output_path: str
@@ -0,0 +1,62 @@
+"""Shared pytest fixtures and markers."""
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents.researcher import _search_memo
+from agents.writer import _draft_memo
+from graph.graph import build_graph
+from utils.llm import _response_cache, _structured_llms
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "integration: runs the compiled LangGraph pipeline end to end"
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_memos():
+    """Start every test with empty process-wide memos and LLM caches."""
+    for memo in (_draft_memo, _search_memo, _structured_llms):
+        memo.clear()
+    _response_cache.clear()
+    yield
+
+
+@pytest.fixture
+def base_state():
+    """A fresh, fully populated AgentState for tests to override."""
+    return {
+        "messages": [],
+        "task": "",
+        "proposal_type": "",
+        "plan": "",
+        "research_needed": [],
+        "research_data": "",
+        "search_queries": [],
+        "draft": "",
+        "critique": "",
+        "score": 0.0,
+        "dimension_scores": {},
+        "revision_count": 0,
+        "user_feedback": "",
+        "questions_for_user": [],
+        "output_path": "",
+    }
+
+
+@pytest.fixture(scope="session")
+def _base_graph():
+    return build_graph()
+
+
+@pytest.fixture
+def compiled_graph(_base_graph):
+    """The graph compiled once per run, with a fresh checkpointer per test.
+
+    Nodes look up the agents' LLMs at call time, so per-test patches
+    still apply to the shared graph.
+    """
+    _base_graph.checkpointer = MemorySaver()
+    return _base_graph
@@ -1,8 +1,9 @@
 """Tests for the App helper functions."""
 
+import io
 import sys
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 @pytest.fixture(scope="module")
@@ -64,3 +65,63 @@ def test_evaluator_label(app_module):
     """Should format evaluator label."""
     assert app_module._evaluator_label(1) == "Evaluator (attempt 1)"
     assert app_module._evaluator_label(3) == "Evaluator (attempt 3)"
+
+
+@pytest.mark.asyncio
+async def test_flush_tokens_coalesces(app_module):
+    """Buffered tokens should go out as one stream_token call."""
+    step = MagicMock()
+    step.stream_token = AsyncMock()
+    buffer = ["Hel", "lo", " world"]
+
+    await app_module._flush_tokens(step, buffer)
+    await app_module._flush_tokens(step, buffer)
+
+    step.stream_token.assert_awaited_once_with("Hello world")
+    assert buffer == []
+
+
+def test_draft_to_pdf_bytes(app_module):
+    """Should render the draft to an in-memory PDF."""
+    pdf = app_module._draft_to_pdf_bytes("# Proposal\n\nSome **bold** text.")
+
+    assert pdf.startswith(b"%PDF")
+
+
+def test_draft_to_docx_bytes_inline_markup(app_module):
+    """Bold, italic and code spans should become formatted runs."""
+    from docx import Document
+
+    data = app_module._draft_to_docx_bytes("- **Bold** then *italic* and `code`")
+    para = Document(io.BytesIO(data)).paragraphs[-1]
+    runs = {run.text: run for run in para.runs}
+
+    assert para.style.name == "List Bullet"
+    assert runs["Bold"].bold
+    assert runs["italic"].italic
+    assert runs["code"].font.name == "Courier New"
+
+
+def test_draft_to_docx_bytes_plain_line(app_module):
+    """A line without markup should be added as a single run."""
+    from docx import Document
+
+    data = app_module._draft_to_docx_bytes("Plain prose, no markup here.")
+    para = Document(io.BytesIO(data)).paragraphs[-1]
+
+    assert [run.text for run in para.runs] == ["Plain prose, no markup here."]
+
+
+def test_draft_to_docx_bytes_headings(app_module):
+    """Markdown headings should map to the matching DOCX heading levels."""
+    from docx import Document
+
+    data = app_module._draft_to_docx_bytes("# One\n## Two\n### Three\n#NoSpace")
+    paras = Document(io.BytesIO(data)).paragraphs
+
+    assert [(p.style.name, p.text) for p in paras] == [
+        ("Heading 1", "One"),
+        ("Heading 2", "Two"),
+        ("Heading 3", "Three"),
+        ("Normal", "#NoSpace"),
+    ]
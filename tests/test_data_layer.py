@@ -1,38 +1,37 @@
 """Tests for the JSON Data Layer."""
 
+import json
 import os
 import pytest
-import shutil
 from unittest.mock import patch
 from chainlit.user import User
 from chainlit.types import Pagination, ThreadFilter
 
-from data_layer import JsonDataLayer
+from data_layer import JsonDataLayer, _cached, _thread_cache, _user_cache
 
-# Use a temporary directory for tests
-TEST_ROOT = os.path.join(os.path.dirname(__file__), ".test_chat_data")
+
+def _read_lines(path) -> list[str]:
+    with open(path) as f:
+        return f.readlines()
+
+
+def _dump_json(path, data) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f)
 
 
 @pytest.fixture
-def data_layer():
-    """Setup and teardown the data layer with temporary storage."""
-    # Setup
-    if os.path.exists(TEST_ROOT):
-        shutil.rmtree(TEST_ROOT)
-    os.makedirs(TEST_ROOT)
-
-    # Patch the paths in the data_layer module
+def data_layer(tmp_path):
+    """Data layer backed by a per-test temporary directory."""
+    _user_cache.clear()
+    _thread_cache.clear()
+    root = str(tmp_path)
     with (
-        patch("data_layer._ROOT", TEST_ROOT),
-        patch("data_layer._USERS_FILE", os.path.join(TEST_ROOT, "users.json")),
-        patch("data_layer._THREADS_DIR", os.path.join(TEST_ROOT, "threads")),
+        patch("data_layer._ROOT", root),
+        patch("data_layer._USERS_FILE", os.path.join(root, "users.json")),
+        patch("data_layer._THREADS_DIR", os.path.join(root, "threads")),
     ):
-        dl = JsonDataLayer()
-        yield dl
-
-    # Teardown
-    if os.path.exists(TEST_ROOT):
-        shutil.rmtree(TEST_ROOT)
+        yield JsonDataLayer()
 
 
 @pytest.mark.asyncio
@@ -126,3 +125,130 @@ async def test_step_lifecycle(data_layer):
     await data_layer.delete_step(step_id)
     thread = await data_layer.get_thread(thread_id)
     assert len(thread["steps"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_step_updates_are_appended(data_layer, tmp_path):
+    """Step writes should append to the thread's log, not rewrite the thread."""
+    thread_id = "thread_log"
+    step = {"id": "s1", "threadId": thread_id, "output": "v1", "createdAt": "1"}
+
+    await data_layer.create_step(step)
+    await data_layer.update_step({**step, "output": "v2"})
+    await data_layer.create_step({**step, "id": "s2", "createdAt": "2"})
+
+    log_path = tmp_path / "threads" / f"{thread_id}.ndjson"
+    assert len(_read_lines(log_path)) == 3
+
+    thread = await data_layer.get_thread(thread_id)
+    assert [(s["id"], s["output"]) for s in thread["steps"]] == [
+        ("s1", "v2"),
+        ("s2", "v1"),
+    ]
+    # Loading compacts the superseded entry away
+    assert len(_read_lines(log_path)) == 2
+
+
+@pytest.mark.asyncio
+async def test_update_does_not_replay_log(data_layer):
+    """An update should be one append, without reading the thread's steps."""
+    step = {"id": "s1", "threadId": "thread_fast", "output": "v1"}
+    await data_layer.create_step(step)
+
+    with patch("data_layer._read_steps") as mock_read:
+        await data_layer.update_step({**step, "output": "v2"})
+    mock_read.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_ignores_unknown_steps(data_layer, tmp_path):
+    """Updating a step that was never created should not add it."""
+    thread_id = "thread_unknown"
+    await data_layer.create_step({"id": "s1", "threadId": thread_id})
+
+    await data_layer.update_step({"id": "ghost", "threadId": thread_id})
+    await data_layer.update_step({"id": "s1", "threadId": "missing_thread"})
+
+    thread = await data_layer.get_thread(thread_id)
+    assert [s["id"] for s in thread["steps"]] == ["s1"]
+    assert not (tmp_path / "threads" / "missing_thread.ndjson").exists()
+
+
+@pytest.mark.asyncio
+async def test_reads_legacy_inline_steps(data_layer, tmp_path):
+    """Threads saved with inline steps should still load and accept updates."""
+    thread_id = "thread_legacy"
+    os.makedirs(tmp_path / "threads")
+    _dump_json(
+        tmp_path / "threads" / f"{thread_id}.json",
+        {
+            "id": thread_id,
+            "steps": [{"id": "old", "threadId": thread_id, "output": "a"}],
+        },
+    )
+
+    await data_layer.update_step({"id": "old", "threadId": thread_id, "output": "b"})
+    thread = await data_layer.get_thread(thread_id)
+    assert [s["output"] for s in thread["steps"]] == ["b"]
+
+    await data_layer.delete_step("old")
+    thread = await data_layer.get_thread(thread_id)
+    assert thread["steps"] == []
+
+
+@pytest.mark.asyncio
+async def test_list_threads_builds_missing_index(data_layer, tmp_path):
+    """Threads saved before the index existed should still be listed."""
+    os.makedirs(tmp_path / "threads")
+    for thread_id, created in (("old_a", "2024-01-01"), ("old_b", "2024-02-01")):
+        _dump_json(
+            tmp_path / "threads" / f"{thread_id}.json",
+            {"id": thread_id, "userId": "u", "createdAt": created},
+        )
+
+    res = await data_layer.list_threads(Pagination(first=10), ThreadFilter(userId="u"))
+
+    assert [t["id"] for t in res.data] == ["old_b", "old_a"]
+    assert (tmp_path / "threads_index.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_until_written(data_layer):
+    """Repeat reads should skip the disk; writes should invalidate them."""
+    await data_layer.create_user(User(identifier="cached_user"))
+    await data_layer.update_thread("t_cached", name="Before")
+    await data_layer.get_user("cached_user")
+    await data_layer.get_thread("t_cached")
+
+    with patch("data_layer._read_json") as mock_read:
+        assert (await data_layer.get_user("cached_user")) is not None
+        assert (await data_layer.get_thread("t_cached"))["name"] == "Before"
+    mock_read.assert_not_called()
+
+    await data_layer.update_thread("t_cached", name="After")
+    thread = await data_layer.get_thread("t_cached")
+    assert thread["name"] == "After"
+
+    # Callers may mutate what they get back without touching the cache
+    thread["steps"].append({"id": "bogus"})
+    assert (await data_layer.get_thread("t_cached"))["steps"] == []
+
+
+@pytest.mark.asyncio
+async def test_caches_and_locks_are_bounded(data_layer):
+    """Expired and least recently used entries should not pile up."""
+    with (
+        patch("data_layer.THREAD_CACHE_SIZE", 2),
+        patch("data_layer.THREAD_LOCKS_SIZE", 2),
+        patch("data_layer._thread_locks", {}) as locks,
+    ):
+        for thread_id in ("a", "b", "c"):
+            await data_layer.update_thread(thread_id, name=thread_id)
+            await data_layer.get_thread(thread_id)
+
+        assert list(_thread_cache) == ["b", "c"]
+        assert len(locks) == 2
+
+    # An expired entry is dropped when looked up, not just ignored
+    assert _cached(_thread_cache, "b", ttl=0.0) is None
+    assert "b" not in _thread_cache
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import pytest
+from pydantic import ValidationError
 
 from agents.evaluator import evaluator_node
 from agents.models import EvaluationOutput
+from utils.llm import MODEL_CONFIG
 
 # ── Sample Pydantic output ───────────────────────────────────────────
 SAMPLE_EVALUATION = EvaluationOutput(
@@ -14,7 +18,6 @@ SAMPLE_EVALUATION = EvaluationOutput(
     completeness=9.0,
     structure=8.0,
     specificity=7.0,
-    overall_score=8.5,
     critique=(
         "1. Make the executive summary more punchy.\n"
         "2. Add more specific data points about the industry.\n"
@@ -28,7 +31,6 @@ SAMPLE_PASSING_EVALUATION = EvaluationOutput(
     completeness=9.0,
     structure=9.0,
     specificity=9.0,
-    overall_score=9.0,
     critique="",
 )
 
@@ -36,67 +38,46 @@ SAMPLE_PASSING_EVALUATION = EvaluationOutput(
 class TestEvaluatorNode:
     """Tests for the evaluator_node."""
 
+    @pytest.mark.asyncio
     @patch("agents.evaluator.get_llm")
-    def test_parses_score_and_critique(self, mock_get_llm):
+    async def test_parses_score_and_critique(self, mock_get_llm, base_state):
         """Should extract score and critique from structured output."""
         mock_llm = MagicMock()
         mock_structured = MagicMock()
-        mock_structured.invoke.return_value = SAMPLE_EVALUATION
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_EVALUATION)
         mock_llm.with_structured_output.return_value = mock_structured
         mock_get_llm.return_value = mock_llm
 
-        state = {
-            "messages": [],
-            "task": "Test task",
-            "draft": "Test draft",
-            "score": 0.0,
-            "revision_count": 0,
-            "proposal_type": "",
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "critique": "",
-            "dimension_scores": {},
-            "user_feedback": "",
-            "questions_for_user": [],
-        }
-
-        result = evaluator_node(state)
-
-        assert result["score"] == 8.5
+        state = {**base_state, "task": "Test task", "draft": "Test draft"}
+
+        result = await evaluator_node(state)
+
+        assert result["score"] == 7.8
         assert "Make the executive summary more punchy" in result["critique"]
         assert result["revision_count"] == 1
 
         # Verify with_structured_output was used
-        mock_llm.with_structured_output.assert_called_once_with(EvaluationOutput)
-        mock_structured.invoke.assert_called_once()
-
+        mock_llm.with_structured_output.assert_called_once_with(
+            EvaluationOutput, method="json_schema", strict=True
+        )
+        mock_get_llm.assert_called_once_with(
+            model=MODEL_CONFIG["evaluator"], temperature=0.0, cache=True
+        )
+        mock_structured.ainvoke.assert_awaited_once()
+
+    @pytest.mark.asyncio
     @patch("agents.evaluator.get_llm")
-    def test_dimension_scores_extracted(self, mock_get_llm):
+    async def test_dimension_scores_extracted(self, mock_get_llm, base_state):
         """Should return all 5 dimension scores."""
         mock_llm = MagicMock()
         mock_structured = MagicMock()
-        mock_structured.invoke.return_value = SAMPLE_EVALUATION
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_EVALUATION)
         mock_llm.with_structured_output.return_value = mock_structured
         mock_get_llm.return_value = mock_llm
 
-        state = {
-            "messages": [],
-            "task": "Test",
-            "draft": "Draft",
-            "score": 0.0,
-            "revision_count": 0,
-            "proposal_type": "",
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "critique": "",
-            "dimension_scores": {},
-            "user_feedback": "",
-            "questions_for_user": [],
-        }
-
-        result = evaluator_node(state)
+        state = {**base_state, "task": "Test", "draft": "Draft"}
+
+        result = await evaluator_node(state)
 
         assert result["dimension_scores"]["Clarity"] == 8.0
         assert result["dimension_scores"]["Persuasiveness"] == 7.0
@@ -104,61 +85,71 @@ class TestEvaluatorNode:
         assert result["dimension_scores"]["Structure"] == 8.0
         assert result["dimension_scores"]["Specificity"] == 7.0
 
+    @pytest.mark.asyncio
     @patch("agents.evaluator.get_llm")
-    def test_passing_score_no_critique(self, mock_get_llm):
+    async def test_passing_score_no_critique(self, mock_get_llm, base_state):
         """High-scoring proposals should have empty critique."""
         mock_llm = MagicMock()
         mock_structured = MagicMock()
-        mock_structured.invoke.return_value = SAMPLE_PASSING_EVALUATION
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_PASSING_EVALUATION)
         mock_llm.with_structured_output.return_value = mock_structured
         mock_get_llm.return_value = mock_llm
 
-        state = {
-            "messages": [],
-            "task": "Test",
-            "draft": "Great draft",
-            "score": 0.0,
-            "revision_count": 0,
-            "proposal_type": "",
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "critique": "",
-            "dimension_scores": {},
-            "user_feedback": "",
-            "questions_for_user": [],
-        }
-
-        result = evaluator_node(state)
+        state = {**base_state, "task": "Test", "draft": "Great draft"}
+
+        result = await evaluator_node(state)
 
         assert result["score"] == 9.0
         assert result["critique"] == ""
 
+    @pytest.mark.asyncio
     @patch("agents.evaluator.get_llm")
-    def test_increments_revision_count(self, mock_get_llm):
+    async def test_increments_revision_count(self, mock_get_llm, base_state):
         """Should increment revision count from current state."""
         mock_llm = MagicMock()
         mock_structured = MagicMock()
-        mock_structured.invoke.return_value = SAMPLE_EVALUATION
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_EVALUATION)
         mock_llm.with_structured_output.return_value = mock_structured
         mock_get_llm.return_value = mock_llm
 
-        state = {
-            "messages": [],
-            "task": "Test",
-            "draft": "Draft",
-            "score": 0.0,
-            "revision_count": 2,
-            "proposal_type": "",
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "critique": "",
-            "dimension_scores": {},
-            "user_feedback": "",
-            "questions_for_user": [],
-        }
-
-        result = evaluator_node(state)
+        state = {**base_state, "task": "Test", "draft": "Draft", "revision_count": 2}
+
+        result = await evaluator_node(state)
 
         assert result["revision_count"] == 3
+
+    @pytest.mark.asyncio
+    @patch("agents.evaluator.get_llm")
+    async def test_draft_with_braces(self, mock_get_llm, base_state):
+        """Braces in the draft must be passed through verbatim, not templated."""
+        mock_llm = MagicMock()
+        mock_structured = MagicMock()
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_EVALUATION)
+        mock_llm.with_structured_output.return_value = mock_structured
+        mock_get_llm.return_value = mock_llm
+
+        draft = 'Config: {"budget": 5000} and {placeholder}'
+        state = {**base_state, "task": "Test", "draft": draft}
+
+        await evaluator_node(state)
+
+        messages = mock_structured.ainvoke.await_args.args[0]
+        assert draft in messages[-1].content
+
+
+class TestEvaluationOutput:
+    """Tests for the EvaluationOutput model."""
+
+    def test_overall_score_is_mean_of_dimensions(self):
+        assert SAMPLE_EVALUATION.overall_score == 7.8
+        assert "overall_score" not in EvaluationOutput.model_json_schema()["properties"]
+
+    def test_rejects_out_of_range_scores(self):
+        with pytest.raises(ValidationError):
+            EvaluationOutput(
+                clarity=11.0,
+                persuasiveness=7.0,
+                completeness=7.0,
+                structure=7.0,
+                specificity=7.0,
+            )
@@ -5,12 +5,12 @@ All LLM and Tavily calls are mocked so the test runs offline.
 
 from __future__ import annotations
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
+import pytest
 from langchain_core.messages import AIMessage
 
 from agents.models import PlannerOutput, SearchQueries
-from graph.graph import build_graph
 
 # ── Mock outputs ─────────────────────────────────────────────────────
 MOCK_PLANNER_OUTPUT = PlannerOutput(
@@ -51,19 +51,24 @@ TechCo is a mid-size SaaS provider based in Austin, TX.
 ### Cloud Migration Trends
 80% of enterprises will migrate to cloud by 2027.
 """
+MOCK_RESEARCH_MESSAGE = AIMessage(content=MOCK_RESEARCH_BRIEF)
 
 
+@pytest.mark.integration
 class TestGraphIntegration:
     """End-to-end test of the planner → researcher pipeline."""
 
+    @pytest.mark.asyncio
     @patch("agents.researcher._search_tavily")
     @patch("agents.researcher.get_llm")
     @patch("agents.planner.get_llm")
-    def test_full_pipeline(
+    async def test_full_pipeline(
         self,
         mock_planner_llm_fn,
         mock_researcher_llm_fn,
         mock_tavily_search,
+        compiled_graph,
+        base_state,
     ):
         """Graph should flow from planner to researcher and produce
         both a plan and research_data."""
@@ -71,41 +76,29 @@ class TestGraphIntegration:
         # ── Mock Planner LLM ──
         mock_p_llm = MagicMock()
         mock_p_structured = MagicMock()
-        mock_p_structured.invoke.return_value = MOCK_PLANNER_OUTPUT
+        mock_p_structured.ainvoke = AsyncMock(return_value=MOCK_PLANNER_OUTPUT)
         mock_p_llm.with_structured_output.return_value = mock_p_structured
         mock_planner_llm_fn.return_value = mock_p_llm
 
         # ── Mock Researcher LLM ──
         mock_r_llm = MagicMock()
         mock_r_structured = MagicMock()
-        mock_r_structured.invoke.return_value = MOCK_QUERIES
+        mock_r_structured.ainvoke = AsyncMock(return_value=MOCK_QUERIES)
         mock_r_llm.with_structured_output.return_value = mock_r_structured
-        mock_r_llm.invoke.return_value = AIMessage(content=MOCK_RESEARCH_BRIEF)
+        mock_r_llm.ainvoke = AsyncMock(return_value=MOCK_RESEARCH_MESSAGE)
         mock_researcher_llm_fn.return_value = mock_r_llm
 
         # ── Mock Tavily ──
         mock_tavily_search.return_value = "Raw results"
 
         # ── Run graph ──
-        graph = build_graph()
         initial_state = {
-            "messages": [],
+            **base_state,
             "task": "Write a technical proposal for TechCo cloud migration",
-            "proposal_type": "",
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "draft": "",
-            "critique": "",
-            "score": 0.0,
-            "dimension_scores": {},
-            "revision_count": 0,
-            "user_feedback": "",
-            "questions_for_user": [],
         }
 
         config = {"configurable": {"thread_id": "test-full-pipeline"}}
-        result = graph.invoke(initial_state, config)
+        result = await compiled_graph.ainvoke(initial_state, config)
 
         # ── Assertions ──
         assert result["plan"] != ""
@@ -114,85 +107,61 @@ class TestGraphIntegration:
         assert result["research_data"] != ""
         assert len(result["messages"]) >= 2  # planner + researcher msgs
 
+    @pytest.mark.asyncio
     @patch("agents.planner.get_llm")
-    def test_planner_questions_interrupt(self, mock_planner_llm_fn):
+    async def test_planner_questions_interrupt(
+        self, mock_planner_llm_fn, compiled_graph, base_state
+    ):
         """When planner has questions, graph should interrupt at ask_user."""
 
         mock_p_llm = MagicMock()
         mock_p_structured = MagicMock()
-        mock_p_structured.invoke.return_value = MOCK_PLANNER_WITH_QUESTIONS
+        mock_p_structured.ainvoke = AsyncMock(return_value=MOCK_PLANNER_WITH_QUESTIONS)
         mock_p_llm.with_structured_output.return_value = mock_p_structured
         mock_planner_llm_fn.return_value = mock_p_llm
 
-        graph = build_graph()
-        initial_state = {
-            "messages": [],
-            "task": "Write a business proposal for fintech",
-            "proposal_type": "",
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "draft": "",
-            "critique": "",
-            "score": 0.0,
-            "dimension_scores": {},
-            "revision_count": 0,
-            "user_feedback": "",
-            "questions_for_user": [],
-        }
+        initial_state = {**base_state, "task": "Write a business proposal for fintech"}
 
         config = {"configurable": {"thread_id": "test-planner-questions"}}
-        graph.invoke(initial_state, config)
+        await compiled_graph.ainvoke(initial_state, config)
 
         # Graph should be interrupted after ask_user — next pending is researcher
-        state = graph.get_state(config)
+        state = compiled_graph.get_state(config)
         assert state.next  # Graph is paused (not finished)
         assert len(state.values.get("questions_for_user", [])) > 0
         assert "What is your company name?" in state.values["questions_for_user"]
 
+    @pytest.mark.asyncio
     @patch("agents.researcher._search_tavily")
     @patch("agents.researcher.get_llm")
     @patch("agents.planner.get_llm")
-    def test_state_flows_between_nodes(
+    async def test_state_flows_between_nodes(
         self,
         mock_planner_llm_fn,
         mock_researcher_llm_fn,
         mock_tavily_search,
+        compiled_graph,
+        base_state,
     ):
         """Verify planner output becomes researcher input."""
 
         mock_p_llm = MagicMock()
         mock_p_structured = MagicMock()
-        mock_p_structured.invoke.return_value = MOCK_PLANNER_OUTPUT
+        mock_p_structured.ainvoke = AsyncMock(return_value=MOCK_PLANNER_OUTPUT)
         mock_p_llm.with_structured_output.return_value = mock_p_structured
         mock_planner_llm_fn.return_value = mock_p_llm
 
         mock_r_llm = MagicMock()
         mock_r_structured = MagicMock()
-        mock_r_structured.invoke.return_value = MOCK_QUERIES
+        mock_r_structured.ainvoke = AsyncMock(return_value=MOCK_QUERIES)
         mock_r_llm.with_structured_output.return_value = mock_r_structured
-        mock_r_llm.invoke.return_value = AIMessage(content=MOCK_RESEARCH_BRIEF)
+        mock_r_llm.ainvoke = AsyncMock(return_value=MOCK_RESEARCH_MESSAGE)
         mock_researcher_llm_fn.return_value = mock_r_llm
 
         mock_tavily_search.return_value = "Raw"
 
-        graph = build_graph()
-        result = graph.invoke(
-            {
-                "messages": [],
-                "task": "Test",
-                "proposal_type": "",
-                "plan": "",
-                "research_data": "",
-                "search_queries": [],
-                "draft": "",
-                "critique": "",
-                "score": 0.0,
-                "dimension_scores": {},
-                "revision_count": 0,
-                "user_feedback": "",
-                "questions_for_user": [],
-            },
+        result = await compiled_graph.ainvoke(
+            {**base_state, "task": "Test"},
             {"configurable": {"thread_id": "test-state-flow"}},
         )
 
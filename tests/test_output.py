@@ -3,53 +3,49 @@
 from __future__ import annotations
 
 import os
-import shutil
+from unittest.mock import patch
 
-from agents.output import output_node, OUTPUT_DIR
+import pytest
+
+from agents.output import output_node
+
+
+def _read_text(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
 
 
 class TestOutputNode:
     """Tests for the output_node."""
 
-    def setup_method(self):
-        """Clean up output dir before test."""
-        if os.path.exists(OUTPUT_DIR):
-            shutil.rmtree(OUTPUT_DIR)
-
-    def teardown_method(self):
-        """Clean up output dir after test."""
-        if os.path.exists(OUTPUT_DIR):
-            shutil.rmtree(OUTPUT_DIR)
+    @pytest.fixture(autouse=True)
+    def isolated_output(self, tmp_path):
+        """Write into a per-test directory instead of ./outputs."""
+        self.output_dir = str(tmp_path / "outputs")
+        with patch("agents.output.OUTPUT_DIR", self.output_dir):
+            yield
 
-    def test_creates_md_only(self):
+    @pytest.mark.asyncio
+    async def test_creates_md_only(self, base_state):
         """Should create .md file."""
         state = {
-            "messages": [],
+            **base_state,
             "task": "Test task",
             "proposal_type": "Business",
             "draft": "# Test Proposal\n\nThis is a test.",
-            "revision_count": 0,
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "critique": "",
-            "score": 0.0,
-            "dimension_scores": {},
-            "user_feedback": "",
-            "questions_for_user": [],
         }
 
-        output_node(state)
+        result = await output_node(state)
 
         # Check files exist
-        assert os.path.exists(OUTPUT_DIR)
-        files = os.listdir(OUTPUT_DIR)
+        assert os.path.exists(self.output_dir)
+        files = os.listdir(self.output_dir)
         md_files = [f for f in files if f.endswith(".md")]
 
         assert len(md_files) == 1
         assert "Business_Proposal" in md_files[0]
+        assert result["output_path"] == os.path.join(self.output_dir, md_files[0])
 
         # Check MD content
-        with open(os.path.join(OUTPUT_DIR, md_files[0]), "r") as f:
-            content = f.read()
-            assert "# Test Proposal" in content
+        content = _read_text(os.path.join(self.output_dir, md_files[0]))
+        assert "# Test Proposal" in content
@@ -5,15 +5,24 @@ These tests mock both the LLM and Tavily so they run offline.
 
 from __future__ import annotations
 
-from unittest.mock import patch, MagicMock
+import os
+from unittest.mock import patch, AsyncMock, MagicMock
 
+import pytest
 from langchain_core.messages import AIMessage
 
 from agents.researcher import (
+    MAX_RAW_RESULTS_CHARS,
+    MAX_RESULT_CHARS,
     researcher_node,
+    _compact,
+    _get_tavily_client,
+    _tavily_client_for,
+    _dedupe_queries,
     _search_tavily,
 )
 from agents.models import SearchQueries
+from utils.llm import MODEL_CONFIG
 
 # ── Sample data ──────────────────────────────────────────────────────
 SAMPLE_PLAN = """\
@@ -39,6 +48,9 @@ SAMPLE_QUERIES = SearchQueries(
     ]
 )
 
+SAMPLE_TWO_QUERIES = SearchQueries(queries=["test query one", "test query two"])
+SAMPLE_SINGLE_QUERY = SearchQueries(queries=["q1"])
+
 SAMPLE_TAVILY_RESPONSE = {
     "results": [
         {
@@ -65,173 +77,362 @@ Source: https://example.com/acme
 The AI consulting market is projected to reach $50B by 2027.
 Source: https://example.com/ai-market
 """
+SAMPLE_SYNTHESIS_MESSAGE = AIMessage(content=SAMPLE_SYNTHESIS)
+SAMPLE_BRIEF_MESSAGE = AIMessage(content="Synthesised brief")
 
 
 # ── Unit tests ───────────────────────────────────────────────────────
 class TestSearchTavily:
     """Tests for the _search_tavily helper (mocked)."""
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "search_kwargs, expected",
+        [
+            (
+                {"return_value": SAMPLE_TAVILY_RESPONSE},
+                ["Acme Corp Profile", "https://example.com/acme"],
+            ),
+            ({"side_effect": Exception("API error")}, ["Search failed"]),
+            ({"return_value": {"results": []}}, ["No results found."]),
+        ],
+        ids=["results", "failure", "empty"],
+    )
+    @patch("agents.researcher._get_tavily_client")
+    async def test_formats_search_outcome(
+        self, mock_client_fn, search_kwargs, expected
+    ):
+        mock_client = MagicMock()
+        mock_client.search = AsyncMock(**search_kwargs)
+        mock_client_fn.return_value = mock_client
+
+        results = await _search_tavily(["test query"])
+
+        for fragment in expected:
+            assert fragment in results
+        mock_client.search.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("agents.researcher._get_tavily_client")
+    async def test_repeated_query_served_from_memo(self, mock_client_fn):
+        """A repeated query should reuse its results; failures are retried."""
+        mock_client = MagicMock()
+        mock_client.search = AsyncMock(
+            side_effect=[Exception("API error"), SAMPLE_TAVILY_RESPONSE]
+        )
+        mock_client_fn.return_value = mock_client
+
+        assert "Search failed" in await _search_tavily(["acme profile"])
+        first = await _search_tavily(["acme profile"])
+        second = await _search_tavily(["Acme  Profile"])
+
+        assert "Acme Corp Profile" in first
+        assert second == first
+        assert mock_client.search.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch("agents.researcher._get_tavily_client")
+    async def test_fresh_search_bypasses_memo(self, mock_client_fn):
+        """Re-research should hit Tavily again even for a memoised query."""
+        mock_client = MagicMock()
+        mock_client.search = AsyncMock(return_value=SAMPLE_TAVILY_RESPONSE)
+        mock_client_fn.return_value = mock_client
+
+        await _search_tavily(["acme profile"])
+        await _search_tavily(["acme profile"], fresh=True)
+
+        assert mock_client.search.await_count == 2
+
+    @pytest.mark.asyncio
     @patch("agents.researcher._get_tavily_client")
-    def test_returns_formatted_results(self, mock_client_fn):
+    async def test_runs_queries_concurrently(self, mock_client_fn):
+        """All queries should be dispatched and their results kept in order."""
         mock_client = MagicMock()
-        mock_client.search.return_value = SAMPLE_TAVILY_RESPONSE
+        mock_client.search = AsyncMock(
+            side_effect=lambda query, **_: {
+                "results": [{"title": query, "url": "u", "content": "c"}]
+            }
+        )
         mock_client_fn.return_value = mock_client
 
-        results = _search_tavily(["test query"])
+        results = await _search_tavily(["first", "second", "third"])
 
-        assert "Acme Corp Profile" in results
-        assert "https://example.com/acme" in results
-        mock_client.search.assert_called_once()
+        assert mock_client.search.await_count == 3
+        assert results.index("**first**") < results.index("**third**")
 
+    @pytest.mark.asyncio
     @patch("agents.researcher._get_tavily_client")
-    def test_handles_search_failure(self, mock_client_fn):
+    async def test_skips_duplicate_and_blank_queries(self, mock_client_fn):
         mock_client = MagicMock()
-        mock_client.search.side_effect = Exception("API error")
+        mock_client.search = AsyncMock(return_value=SAMPLE_TAVILY_RESPONSE)
         mock_client_fn.return_value = mock_client
 
-        results = _search_tavily(["failing query"])
+        await _search_tavily(["acme", " acme ", "", "market"])
 
-        assert "Search failed" in results
+        assert mock_client.search.await_count == 2
 
+    @pytest.mark.asyncio
     @patch("agents.researcher._get_tavily_client")
-    def test_handles_empty_results(self, mock_client_fn):
+    async def test_truncates_long_content(self, mock_client_fn):
         mock_client = MagicMock()
-        mock_client.search.return_value = {"results": []}
+        mock_client.search = AsyncMock(
+            return_value={
+                "results": [{"title": "T", "url": "u", "content": "x" * 5000}]
+            }
+        )
         mock_client_fn.return_value = mock_client
 
-        results = _search_tavily(["empty query"])
-        assert isinstance(results, str)
+        results = await _search_tavily(["long page"])
+
+        assert "x" * MAX_RESULT_CHARS in results
+        assert "x" * (MAX_RESULT_CHARS + 1) not in results
+
+    @pytest.mark.asyncio
+    @patch("agents.researcher._get_tavily_client")
+    async def test_caps_total_length(self, mock_client_fn):
+        mock_client = MagicMock()
+        mock_client.search = AsyncMock(
+            side_effect=lambda query, **_: {
+                "results": [
+                    {"title": query, "url": "u", "content": "y" * MAX_RESULT_CHARS}
+                ]
+                * 3
+            }
+        )
+        mock_client_fn.return_value = mock_client
+
+        results = await _search_tavily([f"topic {i}" for i in range(5)])
+
+        assert results.endswith("[Results truncated]")
+        assert len(results) < MAX_RAW_RESULTS_CHARS + 50
+
+    @pytest.mark.asyncio
+    @patch("agents.researcher._get_tavily_client")
+    async def test_no_queries_skips_client(self, mock_client_fn):
+        results = await _search_tavily([])
+
+        assert results == "No results found."
+        mock_client_fn.assert_not_called()
+
+
+class TestGetTavilyClient:
+    """Tests for the _get_tavily_client helper."""
+
+    def setup_method(self):
+        _tavily_client_for.cache_clear()
+
+    @patch("agents.researcher.AsyncTavilyClient")
+    @patch.dict(os.environ, {"TAVILY_API_KEY": "tvly-test"})
+    def test_reuses_client_across_calls(self, mock_client_cls):
+        assert _get_tavily_client() is _get_tavily_client()
+        mock_client_cls.assert_called_once_with(api_key="tvly-test")
+
+    @patch.dict(os.environ, {"TAVILY_API_KEY": ""})
+    def test_missing_key_raises(self):
+        with pytest.raises(ValueError):
+            _get_tavily_client()
+
+
+class TestCompact:
+    """Tests for the _compact helper."""
+
+    def test_keeps_most_relevant_sentences_in_order(self):
+        content = (
+            "Acme was founded in 1990. The weather was mild. "
+            "Acme revenue grew 20% last year. Lunch was served. "
+            "Acme revenue now tops $2B. Nothing else happened."
+        )
+
+        compacted = _compact("Acme revenue", content)
+
+        assert compacted == (
+            "Acme was founded in 1990. Acme revenue grew 20% last year. "
+            "Acme revenue now tops $2B."
+        )
+
+    def test_short_content_unchanged(self):
+        assert _compact("anything", "One sentence. Two.") == "One sentence. Two."
+
+
+class TestDedupeQueries:
+    """Tests for the _dedupe_queries helper."""
+
+    def test_collapses_near_duplicates(self):
+        queries = [
+            "Acme Corp annual revenue",
+            "acme corp revenue annual",
+            "AI consulting market size 2026",
+        ]
+
+        assert _dedupe_queries(queries) == [
+            "Acme Corp annual revenue",
+            "AI consulting market size 2026",
+        ]
+
+    def test_keeps_distinct_queries(self):
+        assert _dedupe_queries(SAMPLE_QUERIES.queries) == SAMPLE_QUERIES.queries
 
 
 class TestResearcherNode:
     """Tests for the researcher_node graph function."""
 
+    @pytest.mark.asyncio
     @patch("agents.researcher._search_tavily")
     @patch("agents.researcher.get_llm")
-    def test_returns_research_data(self, mock_get_llm, mock_search):
+    async def test_returns_research_data(self, mock_get_llm, mock_search, base_state):
         """researcher_node should return research_data in state."""
         # LLM is called twice: structured (queries) + free-form (synthesis)
         mock_llm = MagicMock()
         mock_structured = MagicMock()
-        mock_structured.invoke.return_value = SAMPLE_QUERIES
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_QUERIES)
         mock_llm.with_structured_output.return_value = mock_structured
-        mock_llm.invoke.return_value = AIMessage(content=SAMPLE_SYNTHESIS)
+        mock_llm.ainvoke = AsyncMock(return_value=SAMPLE_SYNTHESIS_MESSAGE)
         mock_get_llm.return_value = mock_llm
 
         mock_search.return_value = "Raw search results here"
 
         state = {
-            "messages": [],
+            **base_state,
             "task": "Write a proposal for Acme Corp",
             "proposal_type": "Business",
             "plan": SAMPLE_PLAN,
-            "research_data": "",
-            "search_queries": [],
-            "draft": "",
-            "critique": "",
-            "score": 0.0,
-            "dimension_scores": {},
-            "revision_count": 0,
-            "user_feedback": "",
-            "questions_for_user": [],
         }
 
-        result = researcher_node(state)
+        result = await researcher_node(state)
 
         assert "research_data" in result
         assert len(result["research_data"]) > 0
         assert "messages" in result
         assert len(result["messages"]) == 1
 
+    @pytest.mark.asyncio
     @patch("agents.researcher.get_llm")
-    def test_handles_empty_plan(self, mock_get_llm):
+    async def test_handles_empty_plan(self, mock_get_llm, base_state):
         """researcher_node should handle missing plan gracefully."""
-        state = {
-            "messages": [],
-            "task": "Write a proposal",
-            "proposal_type": "",
-            "plan": "",
-            "research_data": "",
-            "search_queries": [],
-            "draft": "",
-            "critique": "",
-            "score": 0.0,
-            "dimension_scores": {},
-            "revision_count": 0,
-            "user_feedback": "",
-            "questions_for_user": [],
-        }
+        state = {**base_state, "task": "Write a proposal"}
 
-        result = researcher_node(state)
+        result = await researcher_node(state)
 
         assert result["research_data"] == ""
         assert "No plan provided" in result["messages"][0].content
 
+    @pytest.mark.asyncio
     @patch("agents.researcher._search_tavily")
     @patch("agents.researcher.get_llm")
-    def test_calls_tavily_with_extracted_queries(self, mock_get_llm, mock_search):
+    async def test_calls_tavily_with_extracted_queries(
+        self, mock_get_llm, mock_search, base_state
+    ):
         """Verify Tavily is called after structured query extraction."""
-        queries = SearchQueries(queries=["test query one", "test query two"])
-
         mock_llm = MagicMock()
         mock_structured = MagicMock()
-        mock_structured.invoke.return_value = queries
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_TWO_QUERIES)
         mock_llm.with_structured_output.return_value = mock_structured
-        mock_llm.invoke.return_value = AIMessage(content="Synthesised brief")
+        mock_llm.ainvoke = AsyncMock(return_value=SAMPLE_BRIEF_MESSAGE)
         mock_get_llm.return_value = mock_llm
         mock_search.return_value = "Raw results"
 
         state = {
-            "messages": [],
+            **base_state,
             "task": "Test",
             "proposal_type": "Business",
             "plan": "### Research Needed\n- topic one\n- topic two",
-            "research_data": "",
-            "search_queries": [],
-            "draft": "",
-            "critique": "",
-            "score": 0.0,
-            "dimension_scores": {},
-            "revision_count": 0,
-            "user_feedback": "",
-            "questions_for_user": [],
         }
 
-        researcher_node(state)
+        await researcher_node(state)
 
-        mock_search.assert_called_once()
+        mock_search.assert_awaited_once()
         # Should pass extracted queries
         queries_arg = mock_search.call_args[0][0]
         assert len(queries_arg) == 2
 
+    @pytest.mark.asyncio
     @patch("agents.researcher._search_tavily")
     @patch("agents.researcher.get_llm")
-    def test_uses_structured_output_for_queries(self, mock_get_llm, mock_search):
+    async def test_uses_structured_output_for_queries(
+        self, mock_get_llm, mock_search, base_state
+    ):
         """Verify with_structured_output is called with SearchQueries."""
         mock_llm = MagicMock()
         mock_structured = MagicMock()
-        mock_structured.invoke.return_value = SearchQueries(queries=["q1"])
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_SINGLE_QUERY)
         mock_llm.with_structured_output.return_value = mock_structured
-        mock_llm.invoke.return_value = AIMessage(content="Brief")
+        mock_llm.ainvoke = AsyncMock(return_value=SAMPLE_BRIEF_MESSAGE)
         mock_get_llm.return_value = mock_llm
         mock_search.return_value = "Results"
 
         state = {
-            "messages": [],
+            **base_state,
             "task": "Test",
             "proposal_type": "Business",
             "plan": "### Research Needed\n- topic",
-            "research_data": "",
-            "search_queries": [],
-            "draft": "",
-            "critique": "",
-            "score": 0.0,
-            "dimension_scores": {},
-            "revision_count": 0,
-            "user_feedback": "",
-            "questions_for_user": [],
         }
 
-        researcher_node(state)
+        await researcher_node(state)
+
+        mock_llm.with_structured_output.assert_called_once_with(
+            SearchQueries, method="json_schema", strict=True
+        )
+        mock_get_llm.assert_any_call(
+            model=MODEL_CONFIG["research_queries"], temperature=1
+        )
+
+    @pytest.mark.asyncio
+    @patch("agents.researcher._search_tavily")
+    @patch("agents.researcher.get_llm")
+    async def test_uses_planner_topics_without_extraction(
+        self, mock_get_llm, mock_search, base_state
+    ):
+        """Planner research topics should be searched without an extra LLM call."""
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(return_value=SAMPLE_BRIEF_MESSAGE)
+        mock_get_llm.return_value = mock_llm
+        mock_search.return_value = "Raw results"
+
+        state = {
+            **base_state,
+            "task": "Test",
+            "proposal_type": "Business",
+            "plan": SAMPLE_PLAN,
+            "research_needed": ["Acme Corp background", "AI consulting trends"],
+        }
+
+        result = await researcher_node(state)
+
+        mock_llm.with_structured_output.assert_not_called()
+        mock_search.assert_awaited_once_with(
+            ["Acme Corp background", "AI consulting trends"], fresh=False
+        )
+        assert result["search_queries"] == [
+            "Acme Corp background",
+            "AI consulting trends",
+        ]
+
+    @pytest.mark.asyncio
+    @patch("agents.researcher._search_tavily")
+    @patch("agents.researcher.get_llm")
+    async def test_feedback_forces_query_extraction(
+        self, mock_get_llm, mock_search, base_state
+    ):
+        """User feedback should be folded in via the extraction LLM call."""
+        mock_llm = MagicMock()
+        mock_structured = MagicMock()
+        mock_structured.ainvoke = AsyncMock(return_value=SAMPLE_QUERIES)
+        mock_llm.with_structured_output.return_value = mock_structured
+        mock_llm.ainvoke = AsyncMock(return_value=SAMPLE_BRIEF_MESSAGE)
+        mock_get_llm.return_value = mock_llm
+        mock_search.return_value = "Raw results"
+
+        state = {
+            **base_state,
+            "task": "Test",
+            "proposal_type": "Business",
+            "plan": SAMPLE_PLAN,
+            "research_needed": ["Acme Corp background"],
+            "user_feedback": "Focus on European competitors",
+        }
+
+        result = await researcher_node(state)
 
-        mock_llm.with_structured_output.assert_called_once_with(SearchQueries)
+        mock_structured.ainvoke.assert_awaited_once()
+        mock_search.assert_awaited_once_with(SAMPLE_QUERIES.queries, fresh=True)
+        assert result["search_queries"] == SAMPLE_QUERIES.queries
@@ -1,14 +1,22 @@
 """Tests for the Utils module."""
 
 import os
-from unittest.mock import patch
-from utils.llm import get_llm
-from utils.templates import PROPOSAL_TEMPLATES
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from utils import run_cache
+from utils.llm import _build_llm, get_llm, get_structured_llm
+from utils.templates import SYSTEM_PROMPTS, USER_TEMPLATE
 
 
 class TestLLM:
     """Tests for llm.py."""
 
+    def setup_method(self):
+        _build_llm.cache_clear()
+
     @patch("utils.llm.ChatGroq")
     @patch.dict(os.environ, {"GROQ_API_KEY": "test_key", "GROQ_MODEL": "test_model"})
     def test_get_llm_configures_correctly(self, mock_chat_groq):
@@ -33,6 +41,85 @@ class TestLLM:
 
             _, kwargs = mock_chat_groq.call_args
             assert kwargs["model"] == DEFAULT_MODEL
+            assert kwargs["cache"] is None
+
+    @patch("utils.llm.ChatGroq")
+    def test_get_llm_cache_enabled(self, mock_chat_groq):
+        """Should share one response cache across cached instances."""
+        from utils.llm import _response_cache
+
+        get_llm(cache=True)
+        get_llm(temperature=0.1, cache=True)
+
+        for _, kwargs in mock_chat_groq.call_args_list:
+            assert kwargs["cache"] is _response_cache
+
+    @patch("utils.llm.ChatGroq")
+    def test_get_llm_reuses_instance(self, mock_chat_groq):
+        """Same configuration should return the memoised instance."""
+        first = get_llm(temperature=0.2)
+        second = get_llm(temperature=0.2)
+
+        assert first is second
+        mock_chat_groq.assert_called_once()
+
+    @patch("utils.llm.ChatGroq")
+    def test_get_llm_shares_http_pool(self, mock_chat_groq):
+        """Different configurations should share one async HTTP client."""
+        from utils.llm import _http_async_client
+
+        get_llm(temperature=0.1)
+        get_llm(temperature=0.4)
+
+        for _, kwargs in mock_chat_groq.call_args_list:
+            assert kwargs["http_async_client"] is _http_async_client
+
+    def test_get_structured_llm_binds_once(self):
+        """Schema binding should be built once per (llm config, schema) pair."""
+
+        class Schema(BaseModel):
+            value: str
+
+        llm = MagicMock()
+        first = get_structured_llm(llm, Schema)
+        second = get_structured_llm(llm, Schema)
+
+        assert first is second
+        llm.with_structured_output.assert_called_once_with(
+            Schema, method="json_schema", strict=True
+        )
+
+    @patch("utils.llm.ChatGroq")
+    def test_structured_llm_keyed_on_api_key(self, mock_chat_groq):
+        """A rotated API key should get a binding on the new client."""
+
+        class Schema(BaseModel):
+            value: str
+
+        mock_chat_groq.side_effect = lambda **kw: MagicMock(
+            model_name=kw["model"], groq_api_key=kw["api_key"], temperature=0.0
+        )
+        with patch.dict(os.environ, {"GROQ_API_KEY": "old"}):
+            old = get_structured_llm(get_llm(model="m"), Schema)
+        with patch.dict(os.environ, {"GROQ_API_KEY": "new"}):
+            new = get_structured_llm(get_llm(model="m"), Schema)
+
+        assert old is not new
+
+    def test_structured_llm_cache_is_bounded(self):
+        """Old bindings should be evicted once the cache is full."""
+
+        class Schema(BaseModel):
+            value: str
+
+        with (
+            patch("utils.llm.STRUCTURED_LLM_CACHE_SIZE", 2),
+            patch("utils.llm._structured_llms", {}) as bindings,
+        ):
+            for _ in range(3):
+                get_structured_llm(MagicMock(), Schema)
+
+            assert len(bindings) == 2
 
 
 class TestTemplates:
@@ -51,6 +138,120 @@ class TestTemplates:
             "General",
         ]
         for key in expected_keys:
-            assert key in PROPOSAL_TEMPLATES
-            assert "{plan}" in PROPOSAL_TEMPLATES[key]
-            assert "{research_data}" in PROPOSAL_TEMPLATES[key]
+            assert key in SYSTEM_PROMPTS
+            assert "{" not in SYSTEM_PROMPTS[key]
+        assert "{plan}" in USER_TEMPLATE
+        assert "{research_data}" in USER_TEMPLATE
+
+
+class TestRunCache:
+    """Tests for run_cache.py."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_cache(self, tmp_path):
+        cache_file = str(tmp_path / "run_cache.json")
+        with (
+            patch("utils.run_cache.RUN_CACHE_FILE", cache_file),
+            patch("utils.run_cache._entries", None),
+        ):
+            yield cache_file
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self):
+        """A stored run should be returned for the same task, ignoring case/spacing."""
+        assert await run_cache.get_cached_run("Write a proposal") is None
+
+        await run_cache.store_run(
+            "Write a proposal",
+            {"task": "Write a proposal", "draft": "# Draft", "messages": ["x"]},
+        )
+        cached = await run_cache.get_cached_run("  write a   PROPOSAL ")
+
+        assert cached == {"task": "Write a proposal", "draft": "# Draft"}
+
+    @pytest.mark.asyncio
+    async def test_persists_to_disk(self, isolated_cache):
+        """Entries should survive a reload from the cache file."""
+        await run_cache.store_run("Task", {"draft": "Saved"})
+
+        with patch("utils.run_cache._entries", None):
+            cached = await run_cache.get_cached_run("Task")
+
+        assert os.path.exists(isolated_cache)
+        assert cached["draft"] == "Saved"
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """The oldest untouched entry should be dropped once the cache is full."""
+        with patch("utils.run_cache.RUN_CACHE_SIZE", 2):
+            await run_cache.store_run("a", {"draft": "A"})
+            await run_cache.store_run("b", {"draft": "B"})
+            await run_cache.get_cached_run("a")
+            await run_cache.store_run("c", {"draft": "C"})
+
+            assert await run_cache.get_cached_run("b") is None
+            assert (await run_cache.get_cached_run("a"))["draft"] == "A"
+            assert (await run_cache.get_cached_run("c"))["draft"] == "C"
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_miss(self):
+        """Entries older than RUN_CACHE_TTL should not be replayed."""
+        await run_cache.store_run("Task", {"task": "Task", "draft": "Old"})
+
+        with patch("utils.run_cache.RUN_CACHE_TTL", 0.0):
+            assert await run_cache.get_cached_run("Task") is None
+        assert await run_cache.get_cached_run("Task") is None  # and dropped
+
+    @pytest.mark.asyncio
+    async def test_config_change_retires_entries(self):
+        """A different model config or template should not replay old runs."""
+        await run_cache.store_run("Task", {"task": "Task", "draft": "Old"})
+
+        with patch("utils.run_cache._config_hash", "other"):
+            assert await run_cache.get_cached_run("Task") is None
+            with patch("utils.run_cache.RUN_CACHE_SIMILARITY", 0.5):
+                assert await run_cache.get_cached_run("Task") is None
+
+    @pytest.mark.asyncio
+    async def test_reworded_request_misses_by_default(self):
+        """Without opting in, only the exact request should hit."""
+        task = (
+            "Act as Alex Chen, Founder of LedgerLoop. Write a 12-month business "
+            "plan pitching corporate bonds to Sequoia Capital and justify a $15M ask."
+        )
+        await run_cache.store_run(task, {"task": task, "draft": "Plan"})
+
+        for old, new in (
+            ("12-month", "12-week"),
+            ("business plan", "grant proposal"),
+            ("and justify", "and do not justify"),
+        ):
+            assert await run_cache.get_cached_run(task.replace(old, new)) is None
+        assert (await run_cache.get_cached_run(task))["draft"] == "Plan"
+
+    @pytest.mark.asyncio
+    async def test_near_match_paraphrase(self):
+        """With near-match enabled, a light rewording should still hit."""
+        task = (
+            "Act as Alex Chen, Founder of LedgerLoop. Write a business plan "
+            "pitching corporate bonds to Sequoia Capital and justify a $15M ask."
+        )
+        await run_cache.store_run(task, {"task": task, "draft": "Plan"})
+
+        with patch("utils.run_cache.RUN_CACHE_SIMILARITY", 0.9):
+            cached = await run_cache.get_cached_run(task.replace("Write", "Draft"))
+
+        assert cached["draft"] == "Plan"
+
+    @pytest.mark.asyncio
+    async def test_near_match_requires_same_names_and_numbers(self):
+        """Changing a name or figure must not reuse another request's proposal."""
+        task = (
+            "Act as Alex Chen, Founder of LedgerLoop. Write a business plan "
+            "pitching corporate bonds to Sequoia Capital and justify a $15M ask."
+        )
+        await run_cache.store_run(task, {"task": task, "draft": "Plan"})
+
+        with patch("utils.run_cache.RUN_CACHE_SIMILARITY", 0.9):
+            assert await run_cache.get_cached_run(task.replace("15M", "20M")) is None
+            assert await run_cache.get_cached_run(task.replace("Sequoia", "Accel")) is None
@@ -2,18 +2,55 @@
 
 Loads GROQ_API_KEY and GROQ_MODEL from the .env file and
 exposes a single `get_llm()` helper that returns a ChatGroq instance.
+Instances are memoised per configuration, so graph nodes can call
+`get_llm()` on every run without rebuilding the Groq client.
+Callers can also opt into an in-process response cache so identical
+prompts (e.g. re-scoring an unchanged draft) skip the Groq round-trip.
 """
 
 import os
+from functools import lru_cache
+
+import httpx
 from dotenv import load_dotenv
+from langchain_core.caches import InMemoryCache
+from langchain_core.runnables import Runnable
 from langchain_groq import ChatGroq
+from pydantic import BaseModel
 
 load_dotenv()
 
 DEFAULT_MODEL = "openai/gpt-oss-120b"
+SMALL_MODEL = "openai/gpt-oss-20b"
+
+# Per-node model choice: only long-form generation needs the 120B model,
+# the structured planner/evaluator/search-query calls run fine on the 20B one.
+MODEL_CONFIG = {
+    "planner": os.getenv("PLANNER_MODEL", SMALL_MODEL),
+    "researcher": os.getenv("RESEARCHER_MODEL", DEFAULT_MODEL),
+    "research_queries": os.getenv("RESEARCH_QUERY_MODEL", SMALL_MODEL),
+    "writer": os.getenv("WRITER_MODEL", DEFAULT_MODEL),
+    "evaluator": os.getenv("EVALUATOR_MODEL", SMALL_MODEL),
+}
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+
+# Keyed by (prompt, model params) — shared across all cached LLM instances
+_response_cache = InMemoryCache(maxsize=LLM_CACHE_SIZE)
+
+# One connection pool for every ChatGroq instance, whatever its settings
+_http_async_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+)
 
+# (model, api key, temperature, cached, schema) -> structured runnable, bounded like
+# _build_llm; insertion order doubles as LRU order
+STRUCTURED_LLM_CACHE_SIZE = 32
+_structured_llms: dict[tuple, Runnable] = {}
 
-def get_llm(model: str | None = None, temperature: float = 0.3) -> ChatGroq:
+
+def get_llm(
+    model: str | None = None, temperature: float = 0.3, cache: bool = False
+) -> ChatGroq:
     """Return a ChatGroq instance configured from environment variables.
 
     Parameters
@@ -23,12 +60,53 @@ def get_llm(model: str | None = None, temperature: float = 0.3) -> ChatGroq:
         Falls back to GROQ_MODEL env var, then DEFAULT_MODEL.
     temperature : float
         Sampling temperature (default 0.3).
+    cache : bool
+        Reuse responses for exact-match prompts (default False). Only
+        enable for calls where a repeated answer is acceptable.
     """
     api_key = os.getenv("GROQ_API_KEY", "")
     resolved_model = model or os.getenv("GROQ_MODEL", DEFAULT_MODEL)
 
+    return _build_llm(resolved_model, api_key, temperature, cache)
+
+
+@lru_cache(maxsize=16)
+def _build_llm(model: str, api_key: str, temperature: float, cache: bool) -> ChatGroq:
+    """Construct a ChatGroq once per distinct configuration."""
     return ChatGroq(
-        model=resolved_model,
+        model=model,
         api_key=api_key,
         temperature=temperature,
+        cache=_response_cache if cache else None,
+        http_async_client=_http_async_client,
+    )
+
+
+async def aclose_http_client() -> None:
+    """Close the shared connection pool (call once, at app shutdown)."""
+    await _http_async_client.aclose()
+
+
+def get_structured_llm(llm: ChatGroq, schema: type[BaseModel]) -> Runnable:
+    """Return *llm* bound to strict JSON-schema output for *schema*.
+
+    The binding (and the JSON schema it derives from the Pydantic model)
+    is built once per LLM configuration and schema, and reused on later
+    calls.
+    """
+    key = (
+        llm.model_name,
+        llm.groq_api_key,
+        llm.temperature,
+        llm.cache is not None,
+        schema,
     )
+    structured = _structured_llms.pop(key, None)
+    if structured is None:
+        structured = llm.with_structured_output(
+            schema, method="json_schema", strict=True
+        )
+        while len(_structured_llms) >= STRUCTURED_LLM_CACHE_SIZE:
+            _structured_llms.pop(next(iter(_structured_llms)))
+    _structured_llms[key] = structured  # mark as most recently used
+    return structured
@@ -0,0 +1,190 @@
+"""Cache of finished proposal runs.
+
+A repeated prompt (e.g. the same starter clicked twice) can replay the
+finished proposal instead of running planner → researcher → writer →
+evaluator again.  Entries are keyed by the normalised task text plus a
+hash of the model config and prompt templates, so changing either retires
+old proposals.  They are held in memory and mirrored to
+``outputs/run_cache.json`` so they survive restarts, and expire after
+``RUN_CACHE_TTL`` seconds since their web research goes stale.
+
+A hit skips the whole run, including the research review checkpoint.
+
+Lookups are exact by default.  Setting ``RUN_CACHE_SIMILARITY`` below 1.0
+opts into a near-match, where a light paraphrase ("Draft a proposal…" vs
+"Write a proposal…") also hits as long as the wording overlaps heavily and
+every name and number is unchanged.  A one-word change can still flip the
+request ("12-month" vs "12-week"), so only enable it for known starters.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+
+from utils.llm import MODEL_CONFIG
+from utils.templates import SYSTEM_PROMPTS, USER_TEMPLATE
+
+RUN_CACHE_FILE = os.path.join("outputs", "run_cache.json")
+RUN_CACHE_SIZE = int(os.getenv("RUN_CACHE_SIZE", "64"))
+RUN_CACHE_TTL = float(os.getenv("RUN_CACHE_TTL", "86400"))  # seconds
+# Minimum word-set overlap (Jaccard) for a near-match; 1.0 (default) disables it
+RUN_CACHE_SIMILARITY = float(os.getenv("RUN_CACHE_SIMILARITY", "1.0"))
+
+# Bump when a prompt outside utils.templates (planner, researcher,
+# evaluator) changes in a way that should retire cached proposals
+RUN_CACHE_VERSION = 1
+
+# State keys worth replaying; messages and per-turn feedback are left out
+CACHED_FIELDS = (
+    "task",
+    "proposal_type",
+    "plan",
+    "research_needed",
+    "research_data",
+    "search_queries",
+    "draft",
+    "critique",
+    "score",
+    "dimension_scores",
+    "revision_count",
+)
+
+# Loaded from disk on first use; insertion order doubles as LRU order
+_entries: dict[str, dict] | None = None
+_lock = asyncio.Lock()
+
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_config_hash = hashlib.sha256(
+    json.dumps(
+        [RUN_CACHE_VERSION, MODEL_CONFIG, SYSTEM_PROMPTS, USER_TEMPLATE],
+        sort_keys=True,
+    ).encode("utf-8")
+).hexdigest()
+
+
+def cache_key(task: str) -> str:
+    """Return the cache key for *task*.
+
+    Case and whitespace are normalised, so trivially different spellings
+    of the same prompt share an entry.  The key also covers the current
+    model config and templates.
+    """
+    normalised = " ".join(task.lower().split())
+    return hashlib.sha256(f"{_config_hash}\0{normalised}".encode()).hexdigest()
+
+
+def _signature(task: str) -> tuple[frozenset[str], frozenset[str]]:
+    """Return ``(words, anchors)`` for near-match comparison.
+
+    *words* is the lower-cased word set.  *anchors* are the tokens that
+    change what is being asked for — numbers and capitalised words (names)
+    other than the first word of a sentence — and must match exactly.
+    """
+    words = frozenset(_WORD_RE.findall(task.lower()))
+    anchors: set[str] = set()
+    for sentence in _SENTENCE_RE.split(task.strip()):
+        for i, token in enumerate(_WORD_RE.findall(sentence)):
+            if any(c.isdigit() for c in token) or (i and token[0].isupper()):
+                anchors.add(token)
+    return words, frozenset(anchors)
+
+
+def _expired(values: dict) -> bool:
+    # Wall-clock time, since entries outlive the process
+    return time.time() - values.get("_cached_at", 0) >= RUN_CACHE_TTL
+
+
+def _find_similar(entries: dict[str, dict], task: str) -> str | None:
+    """Return the key of the closest cached task to *task*, if close enough."""
+    words, anchors = _signature(task)
+    if not words:
+        return None
+    best_key, best_score = None, RUN_CACHE_SIMILARITY
+    for key, values in entries.items():
+        other_task = values.get("task", "")
+        if key != cache_key(other_task) or _expired(values):
+            continue  # expired, or stored under an older config or template
+        other_words, other_anchors = _signature(other_task)
+        if other_anchors != anchors or not other_words:
+            continue
+        score = len(words & other_words) / len(words | other_words)
+        if score >= best_score:
+            best_key, best_score = key, score
+    return best_key
+
+
+def _load() -> dict[str, dict]:
+    try:
+        with open(RUN_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(entries: dict[str, dict]) -> None:
+    os.makedirs(os.path.dirname(RUN_CACHE_FILE), exist_ok=True)
+    tmp_path = f"{RUN_CACHE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, default=str)
+    os.replace(tmp_path, RUN_CACHE_FILE)
+
+
+async def _get_entries() -> dict[str, dict]:
+    global _entries
+    if _entries is None:
+        _entries = await asyncio.to_thread(_load)
+    return _entries
+
+
+async def get_cached_run(task: str) -> dict | None:
+    """Return the cached final state for *task*, or None on a miss.
+
+    Expired entries count as a miss and are dropped.
+
+    Parameters
+    ----------
+    task : str
+        The user's original proposal request.
+    """
+    if RUN_CACHE_SIZE <= 0:
+        return None
+    async with _lock:
+        entries = await _get_entries()
+        key = cache_key(task)
+        if key not in entries and RUN_CACHE_SIMILARITY < 1.0:
+            key = _find_similar(entries, task)
+        values = entries.pop(key, None) if key else None
+        if values is None or _expired(values):
+            return None
+        entries[key] = values  # mark as most recently used
+    return {k: v for k, v in values.items() if k != "_cached_at"}
+
+
+async def store_run(task: str, values: dict) -> None:
+    """Cache the final state *values* of a completed run for *task*.
+
+    Parameters
+    ----------
+    task : str
+        The user's original proposal request.
+    values : dict
+        Final graph state; only ``CACHED_FIELDS`` are kept.
+    """
+    if RUN_CACHE_SIZE <= 0:
+        return
+    entry = {field: values[field] for field in CACHED_FIELDS if field in values}
+    entry.setdefault("task", task)  # needed for near-match lookups
+    entry["_cached_at"] = time.time()
+    async with _lock:
+        entries = await _get_entries()
+        key = cache_key(task)
+        entries.pop(key, None)
+        while len(entries) >= RUN_CACHE_SIZE:
+            entries.pop(next(iter(entries)))
+        entries[key] = entry
+        await asyncio.to_thread(_save, dict(entries))
@@ -1,9 +1,12 @@
-"""Collection of proposal templates for the Writer Agent.
+"""Collection of proposal prompts for the Writer Agent.
 
-Each key corresponds to a proposal type detected by the Planner.
+Each key of ``SYSTEM_PROMPTS`` corresponds to a proposal type detected by
+the Planner.  System prompts are fully static, so they stay byte-identical
+across calls (and providers with prefix caching can reuse them); the plan
+and research brief are sent separately via ``USER_TEMPLATE``.
 """
 
-# Common instructions shared by all templates
+# Common instructions shared by all proposal types
 _COMMON_INSTRUCTIONS = """\
 Using the Plan and Research Brief below, write a full, publish-ready \
 proposal draft. Follow these guidelines rigorously:
@@ -34,7 +37,17 @@ numerically consistent and their sum matches the total requested amount.
 - Cite research data points with source names where applicable.
 """
 
-PROPOSAL_TEMPLATES = {
+# Per-request human message that follows the system prompt
+USER_TEMPLATE = """\
+Plan:
+{plan}
+
+Research Brief:
+{research_data}
+"""
+
+# Type-specific persona and guidance, keyed by proposal type
+_PERSONAS = {
     "Business": """\
 You are an expert business consultant who has written hundreds of \
 winning business proposals. Your proposals are known for clear ROI \
@@ -44,14 +57,6 @@ projections, sharp competitive positioning, and executive-ready formatting.
 - Lead with the business opportunity and quantified value proposition.
 - Include competitor differentiation in the solution section.
 - Present pricing with clear justification and flexible options if relevant.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
     "Grant": """\
 You are a professional grant writer with a track record of securing \
@@ -63,14 +68,6 @@ Your proposals emphasise measurable impact and sustainability.
 - Clearly link objectives → activities → outputs → outcomes.
 - Include impact metrics, evaluation methodology, and a sustainability plan.
 - Budget must align precisely with proposed activities.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
     "Technical": """\
 You are a senior technical solutions architect who translates complex \
@@ -82,14 +79,6 @@ depth with accessibility.
 - Address scalability, security, and maintainability explicitly.
 - Present a phased implementation approach with clear milestones.
 - Highlight risk mitigation strategies for technical challenges.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
     "Sales": """\
 You are a top-tier sales executive who consistently closes high-value \
@@ -101,14 +90,6 @@ action-oriented.
 - Quantify ROI and time-to-value with specific numbers.
 - Include social proof (case studies, testimonials, metrics from similar clients).
 - End with a clear, low-friction call to action and next steps.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
     "Project": """\
 You are a senior project manager (PMP-certified) with expertise in \
@@ -119,14 +100,6 @@ scoping, planning, and delivering complex projects on time and budget.
 - Define roles, responsibilities, and governance structure.
 - Address risk management with a risk register summary.
 - Present a realistic timeline with dependencies noted.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
     "Research": """\
 You are an experienced academic researcher who has published in top-tier \
@@ -138,14 +111,6 @@ methodologically rigorous.
 - Clearly state hypotheses or research objectives.
 - Detail the methodology, sampling strategy, and analytical framework.
 - Include ethical considerations and limitations.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
     "Partnership": """\
 You are a strategic partnerships lead who has brokered alliances between \
@@ -157,14 +122,6 @@ win-win narratives.
 - Map complementary strengths and how they combine.
 - Define governance, revenue sharing, and IP considerations.
 - Propose pilot or phased engagement to reduce commitment risk.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
     "General": """\
 You are a versatile proposal writer who adapts tone and structure to any \
@@ -175,13 +132,9 @@ regardless of domain.
 - Adapt the formality level to match the apparent audience.
 - Ensure every section adds unique value — no filler content.
 - Close with a clear summary and recommended next steps.
-"""
-    + _COMMON_INSTRUCTIONS
-    + """
-Plan:
-{plan}
-
-Research Brief:
-{research_data}
 """,
 }
+
+SYSTEM_PROMPTS = {
+    name: persona + _COMMON_INSTRUCTIONS for name, persona in _PERSONAS.items()
+}